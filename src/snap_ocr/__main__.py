@@ -11,7 +11,7 @@ Overview
 Key Features
 - Global hotkey via pynput: default "<ctrl>+<shift>+s" (configurable).
 - Screenshot via mss across all displays (monitor 0 virtual screen).
-- OCR via pytesseract; clear errors if Tesseract missing or language packs absent.
+- OCR via an in-process tesserocr engine when installed (`pip install snap-ocr[fast]`), otherwise pytesseract; clear errors if Tesseract missing or language packs absent.
 - Atomic writes for PNG and TXT.
 - Tray actions: Take Screenshot, Toggle Overwrite Mode, Open Folders, Reload Config, View Log, View Last Error, Quit.
 - Notifications via plyer; gracefully degrades if notifications unavailable.
@@ -93,14 +93,35 @@ Acceptance Tests (Manual)
 from __future__ import annotations
 
 import argparse
+import multiprocessing
+import os
 import sys
 import time
 from typing import Optional, Sequence
 
+from PIL import Image
+
 from snap_ocr.app import App, Job
+from snap_ocr.batch import BatchStats, run_batch
 from snap_ocr.config import ConfigValidationError, load_or_create_config, save_config_if_first_run
-from snap_ocr.paths import get_config_path, open_in_file_manager
+from snap_ocr.encoding import benchmark_png
+from snap_ocr.layout import MigrateStats, migrate_layout
+from snap_ocr.logging_conf import configure_logging
+from snap_ocr.ocr import create_ocr_backend
+from snap_ocr.ocr_pool import OcrProcessPool
+from snap_ocr.paths import get_config_path, get_state_dir, open_in_file_manager
 from snap_ocr.perm_bootstrap import bootstrap_permissions
+from snap_ocr.preprocess import Pipeline
+from snap_ocr.profiles import (
+    calibrate,
+    load_calibration,
+    load_profiles,
+    resolve_profile,
+    sample_images,
+    save_calibration,
+)
+from snap_ocr.retention import ARCHIVE_DIRNAME, restore_capture
+from snap_ocr.search_index import INDEX_FILENAME, SearchIndex, format_hit
 
 
 def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
@@ -120,10 +141,66 @@ def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
         action="store_true",
         help="Open config.yaml in the default file manager.",
     )
+    parser.add_argument(
+        "--calibrate",
+        action="store_true",
+        help="Time each OCR profile on recent captures and pick one for ocr_profile: auto.",
+    )
+    parser.add_argument(
+        "--ocr-dir",
+        metavar="PATH",
+        help="OCR every image under PATH on a worker pool and exit (resumable).",
+    )
+    parser.add_argument(
+        "--ocr-out",
+        metavar="DIR",
+        help="With --ocr-dir: write .txt files under DIR (mirroring the tree) instead of next to each image.",
+    )
+    parser.add_argument(
+        "--bench-encoder",
+        metavar="IMAGE",
+        help="Time Pillow's PNG encoder against the parallel one on IMAGE at png_compress_level and exit.",
+    )
+    parser.add_argument(
+        "--migrate-layout",
+        action="store_true",
+        help="Move flat captures into the folders filename_pattern describes (e.g. {year}/{month}/{day}) and exit (resumable).",
+    )
+    parser.add_argument(
+        "--search",
+        metavar="QUERY",
+        help="Print the best-matching saved captures for QUERY (FTS5 syntax or plain words) and exit.",
+    )
+    parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Rebuild the search index from every .txt in save_dir_text and exit.",
+    )
+    parser.add_argument(
+        "--restore",
+        metavar="NAME",
+        help="Extract an archived capture (file name without extension) back into the output folders and exit.",
+    )
     args = parser.parse_args(argv)
-    selected = sum(bool(flag) for flag in (args.capture_once, args.show_config_path, args.open_config))
+    selected = sum(
+        bool(flag)
+        for flag in (
+            args.capture_once,
+            args.show_config_path,
+            args.open_config,
+            args.calibrate,
+            args.ocr_dir,
+            args.bench_encoder,
+            args.search,
+            args.reindex,
+            args.migrate_layout,
+            args.restore,
+        )
+    )
     if selected > 1:
         parser.error("Options are mutually exclusive; choose only one.")
+    if args.ocr_out and not args.ocr_dir:
+        parser.error("--ocr-out requires --ocr-dir.")
     return args
 
 
@@ -151,7 +228,14 @@ def _capture_once() -> int:
             app.hotkey.stop()
         except Exception:
             pass
-    if result:
+        app.encoder.shutdown(wait=True)
+        app.writer.close()
+        app.capture.close()
+        app.ocr_pool.close()
+        app.ocr_backend.close()
+        app._close_ocr_cache()
+        app._close_search_index()
+    if result and all(os.path.isfile(path) for path in result):
         img_path, txt_path = result
         print(f"Saved image: {img_path}")
         print(f"Saved text:  {txt_path}")
@@ -160,6 +244,173 @@ def _capture_once() -> int:
     return 1
 
 
+def _calibrate() -> int:
+    cfg = load_or_create_config()
+    configure_logging(cfg.log_level)
+    paths = sample_images(cfg.save_dir_images, cfg.calibration_samples)
+    if not paths:
+        print(f"No saved captures found in {cfg.save_dir_images}; take a few screenshots first.", file=sys.stderr)
+        return 1
+    backend = create_ocr_backend(cfg.ocr_backend, cfg.tesseract_cmd)
+    try:
+        result = calibrate(
+            paths,
+            load_profiles(cfg.ocr_profiles),
+            cfg.ocr_lang,
+            cfg.tesseract_cmd,
+            backend,
+            Pipeline.from_config(cfg.preprocess),
+            cfg.calibration_budget_ms,
+        )
+    finally:
+        backend.close()
+    print(f"Calibrated on {len(paths)} captures ({backend.name}, budget {cfg.calibration_budget_ms} ms):")
+    for name, stats in result["profiles"].items():
+        marker = "*" if name == result["chosen"] else " "
+        print(f" {marker} {name:<12} median {stats['median_ms']:>8.1f} ms   p90 {stats['p90_ms']:>8.1f} ms")
+    path = save_calibration(result)
+    print(f"Chosen profile: {result['chosen']} (saved to {path}; used when ocr_profile is 'auto')")
+    return 0
+
+
+def _bench_encoder(path: str) -> int:
+    cfg = load_or_create_config()
+    try:
+        with Image.open(path) as src:
+            img = src.convert("RGB") if src.mode not in ("L", "RGB") else src.copy()
+    except (OSError, ValueError) as exc:
+        print(f"Cannot read image {path}: {exc}", file=sys.stderr)
+        return 1
+    level = cfg.png_compress_level
+    results = benchmark_png(img, level)
+    print(f"PNG encode of {img.width}x{img.height} {img.mode} at compress_level {level} ({os.cpu_count()} CPUs):")
+    for name, stats in results.items():
+        lossless = "lossless" if stats["lossless"] else "MISMATCH"
+        print(f"  {name:<9} median {stats['median_ms']:>8.1f} ms   {int(stats['bytes']):>11,} bytes   {lossless}")
+    pillow, parallel = results["pillow"], results["parallel"]
+    print(
+        f"Parallel: {pillow['median_ms'] / parallel['median_ms']:.2f}x speed, "
+        f"{100.0 * (parallel['bytes'] / pillow['bytes'] - 1.0):+.1f}% size"
+    )
+    return 0 if parallel["lossless"] else 1
+
+
+def _search(query: str) -> int:
+    path = os.path.join(get_state_dir(), INDEX_FILENAME)
+    if not os.path.exists(path):
+        print("No search index yet; captures are indexed as they are saved, or run 'snap-ocr --reindex'.", file=sys.stderr)
+        return 1
+    index = SearchIndex(path)
+    try:
+        started = time.perf_counter()
+        hits = index.search(query)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        for hit in hits:
+            print(format_hit(hit))
+        print(f"{len(hits)} hits of {index.count()} captures in {elapsed_ms:.1f} ms")
+    finally:
+        index.close()
+    return 0 if hits else 1
+
+
+def _reindex() -> int:
+    cfg = load_or_create_config()
+    configure_logging(cfg.log_level)
+    index = SearchIndex(os.path.join(get_state_dir(), INDEX_FILENAME))
+    started = time.perf_counter()
+
+    def report(indexed: int) -> None:
+        print(f"\r{indexed} captures indexed", end="", flush=True)
+
+    try:
+        count = index.rebuild(cfg.save_dir_text, cfg.save_dir_images, progress=report)
+    except KeyboardInterrupt:
+        print("\nInterrupted; the index is partial until --reindex completes.", file=sys.stderr)
+        return 130
+    finally:
+        index.close()
+    print(f"\nIndexed {count} captures from {cfg.save_dir_text} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+def _migrate_layout() -> int:
+    cfg = load_or_create_config()
+    configure_logging(cfg.log_level)
+    if "/" not in cfg.filename_pattern:
+        print(
+            f"filename_pattern {cfg.filename_pattern!r} has no folders; set e.g. "
+            '"{year}/{month}/{day}/{base}_{timestamp}" first.',
+            file=sys.stderr,
+        )
+        return 1
+    index_path = os.path.join(get_state_dir(), INDEX_FILENAME)
+    index = SearchIndex(index_path) if os.path.exists(index_path) else None
+
+    def report(stats: MigrateStats) -> None:
+        print(f"\r{stats.summary()}", end="", flush=True)
+
+    try:
+        stats = migrate_layout(
+            [cfg.save_dir_images, cfg.save_dir_text],
+            cfg.filename_pattern,
+            cfg.base_filename,
+            progress=report,
+            on_moved=index.relocate if index is not None else None,
+        )
+    except KeyboardInterrupt:
+        print("\nInterrupted; run the same command again to move the rest.", file=sys.stderr)
+        return 130
+    finally:
+        if index is not None:
+            index.close()
+    print(f"\r{stats.summary()}")
+    return 1 if stats.failed else 0
+
+
+def _restore(name: str) -> int:
+    cfg = load_or_create_config()
+    configure_logging(cfg.log_level)
+    archive_dir = os.path.join(cfg.save_dir_images, ARCHIVE_DIRNAME)
+    restored = restore_capture(archive_dir, name, cfg.save_dir_images, cfg.save_dir_text)
+    if not restored:
+        print(f"No archived capture named {name!r} in {archive_dir}", file=sys.stderr)
+        return 1
+    for path in restored:
+        print(f"Restored: {path}")
+    return 0
+
+
+def _ocr_dir(root: str, out_dir: Optional[str]) -> int:
+    if not os.path.isdir(root):
+        print(f"Not a directory: {root}", file=sys.stderr)
+        return 1
+    cfg = load_or_create_config()
+    configure_logging(cfg.log_level)
+    profile = resolve_profile(load_profiles(cfg.ocr_profiles), cfg.ocr_profile, load_calibration())
+    pool = OcrProcessPool(cfg.ocr_backend, cfg.tesseract_cmd, cfg.ocr_workers)
+
+    def report(stats: BatchStats) -> None:
+        print(f"\r{stats.summary()}", end="", flush=True)
+
+    try:
+        stats = run_batch(
+            root,
+            cfg.ocr_lang,
+            pool,
+            profile,
+            Pipeline.from_config(cfg.preprocess),
+            out_dir=out_dir,
+            progress=report,
+        )
+    except KeyboardInterrupt:
+        print("\nInterrupted; run the same command again to resume.", file=sys.stderr)
+        return 130
+    finally:
+        pool.close()
+    print()
+    return 1 if stats.failed else 0
+
+
 def main(argv: Optional[Sequence[str]] = None) -> None:
     args = _parse_args(argv)
     try:
@@ -172,6 +423,20 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
             return
         if args.capture_once:
             raise SystemExit(_capture_once())
+        if args.calibrate:
+            raise SystemExit(_calibrate())
+        if args.ocr_dir:
+            raise SystemExit(_ocr_dir(args.ocr_dir, args.ocr_out))
+        if args.bench_encoder:
+            raise SystemExit(_bench_encoder(args.bench_encoder))
+        if args.search:
+            raise SystemExit(_search(args.search))
+        if args.reindex:
+            raise SystemExit(_reindex())
+        if args.migrate_layout:
+            raise SystemExit(_migrate_layout())
+        if args.restore:
+            raise SystemExit(_restore(args.restore))
 
         app = App()
         app.run()
@@ -188,4 +453,5 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # OCR worker processes in PyInstaller builds
     main()
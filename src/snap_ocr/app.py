@@ -1,19 +1,43 @@
 from __future__ import annotations
 
+import json
 import logging
 import os
-import queue
 import sys
 import threading
 import time
-from dataclasses import dataclass
-from typing import Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from .config import Config, ConfigValidationError, load_or_create_config, save_config_if_first_run
+from .config import (
+    Config,
+    ConfigValidationError,
+    is_capture_mode,
+    load_or_create_config,
+    named_regions,
+    save_config_if_first_run,
+)
+from .dedup import DedupIndex, SavedCapture, dhash, files_size, pixel_digest
+from .encoding import IMAGE_FORMATS, encode_image
 from .errors import ErrorCode, SnapOcrError
+from .frames import FrameSpool, HeldFrame
 from .hotkey import HotkeyManager
+from .incremental import IncrementalOcr
+from .layout import CaptureNames, format_stem
 from .logging_conf import configure_logging
-from .ocr import perform_ocr, build_tesseract_missing_message, build_ocr_failed_message
+from .ocr import (
+    OUTPUT_EXTENSIONS,
+    create_ocr_backend,
+    perform_ocr,
+    perform_ocr_lines,
+    perform_ocr_outputs,
+    warm_up,
+    build_tesseract_missing_message,
+    build_ocr_failed_message,
+)
+from .ocr_cache import CACHE_FILENAME, OcrCache
+from .ocr_pool import OcrProcessPool
 from .paths import (
     ensure_dir,
     get_log_file_path,
@@ -21,17 +45,58 @@ from .paths import (
     open_in_file_manager,
     open_in_text_editor,
     get_logs_dir,
+    get_state_dir,
+)
+from .preprocess import Pipeline
+from .profiles import OcrProfile, load_calibration, load_profiles, resolve_profile
+from .retention import RetentionService
+from .screenshot import CaptureBackend
+from .search_index import INDEX_FILENAME, SearchIndex
+from .stages import StageMetrics, StagedPipeline
+from .text_detect import find_text_regions
+from .tiling import (
+    monitor_tiles,
+    named_region_tiles,
+    ocr_tiles,
+    ocr_tiles_each,
+    ocr_tiles_inline,
+    region_tiles,
+    regions_bbox,
 )
-from .screenshot import capture_full_screenshot, capture_region
 from .tray import TrayManager
-from .util import atomic_write_bytes, atomic_write_text, build_timestamped_name
-from .region_capture import pick_region_overlay
+from .watch import Watcher
+from .writer import STRICT_FLUSH_TIMEOUT_S, ArtifactWriter
+from .region_capture import clear_zone_cache, pick_region_overlay
 
 
 @dataclass
 class Job:
-    reason: str  # 'hotkey' or 'tray'
-    requested_at: float
+    reason: str  # 'hotkey', 'tray', 'cli' or 'watch'
+    requested_at: float  # trigger time (time.monotonic)
+    mode: Optional[str] = None  # capture mode at trigger time; None = current
+    frame: Optional[HeldFrame] = None  # pixels grabbed at trigger time
+    grabbed_at: Optional[float] = None  # wall-clock time of the grab (time.time); names the files
+
+
+@dataclass
+class CaptureTask:
+    """A job's state as it moves through the capture → encode → OCR → write stages."""
+
+    job: Job
+    mode: str = "full"
+    image: Optional[Any] = None
+    stem: str = ""
+    img_path: str = ""
+    txt_path: str = ""
+    encoding: Optional["Future[Union[bytes, memoryview]]"] = None  # runs beside OCR; awaited by the write stage
+    text: str = ""
+    documents: Dict[str, bytes] = field(default_factory=dict)
+    error: Optional[SnapOcrError] = None  # OCR failure, reported after the image is saved
+    digest: str = ""  # exact pixel key in the dedup index
+    duplicate: Optional[SavedCapture] = None  # earlier capture whose files this one links to
+    duplicate_kind: str = ""  # "exact" (all files) | "near" (text files only)
+    text_source: Optional[str] = None  # text file a duplicate's text was linked from
+    timings: Dict[str, float] = field(default_factory=dict)
 
 
 class App:
@@ -50,20 +115,41 @@ class App:
         self.overwrite_mode = self.config.overwrite_mode
         self.consecutive_mode = self.overwrite_mode  # legacy alias
         setattr(self.config, "consecutive_mode", self.overwrite_mode)  # legacy attribute for compatibility
-        self.last_saved_paths: Optional[Tuple[str, str]] = None
+        self.last_saved_paths: Optional[Tuple[str, ...]] = None
         self.capture_mode = getattr(self.config, "capture_mode", "full")
-        self.worker_queue: queue.Queue[Optional[Job]] = queue.Queue()
 
         # Components
+        self.capture = CaptureBackend()
+        self.frames = FrameSpool(self.config.frame_queue_max_mb * 1024 * 1024)
+        self.ocr_backend = create_ocr_backend(self.config.ocr_backend, self.config.tesseract_cmd)
+        self.logger.info("OCR backend: %s", self.ocr_backend.name)
+        self.ocr_pool = OcrProcessPool(self.config.ocr_backend, self.config.tesseract_cmd, self.config.ocr_workers)
+        self.ocr_cache = self._build_ocr_cache(self.config)
+        self.search_index = self._build_search_index(self.config)
+        self.incremental_ocr = IncrementalOcr()
+        self.dedup = DedupIndex(self.config.dedup_history)
+        self.preprocess = Pipeline.from_config(self.config.preprocess)
+        self.ocr_profiles = load_profiles(self.config.ocr_profiles)
+        self.ocr_profile = self.config.ocr_profile
+        self.calibration = load_calibration()
+        self._profile_pipelines: Dict[str, Pipeline] = {}
         self.hotkey = HotkeyManager(
             hotkey_str=self.config.hotkey,
             on_activate=self.on_hotkey_triggered,
             on_error=self._on_hotkey_error,
         )
+        self.watcher = Watcher(self)
         self.tray = TrayManager(app=self)
+        self.capture.on_layout_change = self.tray.refresh_menu
 
-        # Worker thread
-        self.worker_thread = threading.Thread(target=self._worker_loop, name="snap-ocr-worker", daemon=True)
+        # Capture → OCR → write stages; image encoding runs beside OCR on its own threads
+        encode_workers = self.config.pipeline_workers.get("encode", 1)
+        self.encoder = ThreadPoolExecutor(max_workers=encode_workers, thread_name_prefix="snap-ocr-encode")
+        self.encode_metrics = StageMetrics("encode", encode_workers)
+        # Files are handed to a group-commit writer thread; only `strict` durability waits for it
+        self.writer = ArtifactWriter(self.config.write_durability, on_error=self._on_write_error)
+        self.pipeline = self._build_pipeline()
+        self.retention = self._build_retention(self.config)
 
     # Public API used by tray/hotkey
     def on_hotkey_triggered(self) -> None:
@@ -87,10 +173,18 @@ class App:
         self.toggle_overwrite_mode()
 
     def set_capture_mode(self, mode: str) -> None:
-        if mode in ("full", "region", "fancyzones", "macsyzones"):
+        if is_capture_mode(mode):
             self.capture_mode = mode
             self.logger.info("Capture mode set to %s", mode)
 
+    def toggle_watch_mode(self) -> None:
+        self.watcher.toggle()
+
+    def set_ocr_profile(self, name: str) -> None:
+        if name == "auto" or name in self.ocr_profiles:
+            self.ocr_profile = name
+            self.logger.info("OCR profile set to %s", name)
+
     def pick_region(self) -> None:
         try:
             region = pick_region_overlay()
@@ -130,6 +224,7 @@ class App:
             new_cfg = load_or_create_config()
             # Apply updates
             self._apply_config(new_cfg)
+            self.tray.refresh_menu()  # profiles may have been added or removed
             self._notify("Snap OCR", "Configuration reloaded.")
         except ConfigValidationError as e:
             msg = f"{e}\nFix the configuration at {get_config_path()} and try again."
@@ -147,8 +242,10 @@ class App:
             self.hotkey.stop()
         except Exception:
             pass
+        self.watcher.stop()
+        self.retention.stop(timeout=5)
         self._stopping.set()
-        self.worker_queue.put(None)
+        self.pipeline.stop()
         if self.tray is not None:
             try:
                 self.tray.stop()
@@ -157,12 +254,27 @@ class App:
 
     # Lifecycle
     def run(self) -> None:
-        self.worker_thread.start()
+        self.pipeline.start()
+        if self.config.ocr_warmup:
+            self._warm_ocr()
         self.hotkey.start()
+        if self.config.watch_on_start:
+            self.watcher.start()
+        self.retention.start()
         self.tray.run()  # blocking until quit
 
         # Join worker on exit
-        self.worker_thread.join(timeout=2)
+        self.pipeline.join(timeout=2)
+        self.encoder.shutdown(wait=True)
+        self.writer.close(timeout=10)
+        self.logger.info("Pipeline stats: %s; %s", self.pipeline.summary(), self.encode_metrics.summary())
+        self.logger.info("Writer stats: %s", self.writer.stats.summary())
+        self.logger.info("Dedup stats: %s", self.dedup.summary())
+        self.capture.close()
+        self.ocr_pool.close()
+        self.ocr_backend.close()
+        self._close_ocr_cache()
+        self._close_search_index()
 
     # Internal
     def _apply_config(self, new_cfg: Config) -> None:
@@ -178,16 +290,130 @@ class App:
         if new_cfg.hotkey != self.config.hotkey:
             self.hotkey.update_hotkey(new_cfg.hotkey)
 
+        # Swap OCR engine if backend selection changed; old engines are released
+        if (new_cfg.ocr_backend, new_cfg.tesseract_cmd) != (self.config.ocr_backend, self.config.tesseract_cmd):
+            old_backend = self.ocr_backend
+            self.ocr_backend = create_ocr_backend(new_cfg.ocr_backend, new_cfg.tesseract_cmd)
+            old_backend.close()
+            self.logger.info("OCR backend: %s", self.ocr_backend.name)
+        if (new_cfg.ocr_backend, new_cfg.tesseract_cmd, new_cfg.ocr_workers) != (
+            self.config.ocr_backend,
+            self.config.tesseract_cmd,
+            self.config.ocr_workers,
+        ):
+            self.ocr_pool.close()
+            self.ocr_pool = OcrProcessPool(new_cfg.ocr_backend, new_cfg.tesseract_cmd, new_cfg.ocr_workers)
+        if (new_cfg.ocr_cache, new_cfg.ocr_cache_max_mb) != (self.config.ocr_cache, self.config.ocr_cache_max_mb):
+            self._close_ocr_cache()
+            self.ocr_cache = self._build_ocr_cache(new_cfg)
+        if new_cfg.search_index != self.config.search_index:
+            self._close_search_index()
+            self.search_index = self._build_search_index(new_cfg)
+
+        # Stored band text is only valid for the language/engine/preprocessing that produced it
+        self.incremental_ocr.reset()
+        self.dedup.reset(new_cfg.dedup_history)
+        self.writer.durability = new_cfg.write_durability.lower()
+        if self._retention_settings(new_cfg) != self._retention_settings(self.config):
+            self.retention.stop(timeout=5)
+            self.retention = self._build_retention(new_cfg)
+            self.retention.start()
+        clear_zone_cache()
+        self.preprocess = Pipeline.from_config(new_cfg.preprocess)
+        self.ocr_profiles = load_profiles(new_cfg.ocr_profiles)
+        self.ocr_profile = new_cfg.ocr_profile
+        self.calibration = load_calibration()
+        self._profile_pipelines = {}
+
+        # Engines that were replaced or now need a different language start cold again
+        rewarm = new_cfg.ocr_warmup and (
+            (new_cfg.ocr_lang, new_cfg.ocr_backend, new_cfg.tesseract_cmd, new_cfg.ocr_workers, new_cfg.ocr_parallel)
+            != (
+                self.config.ocr_lang,
+                self.config.ocr_backend,
+                self.config.tesseract_cmd,
+                self.config.ocr_workers,
+                self.config.ocr_parallel,
+            )
+            or new_cfg.ocr_profile != self.config.ocr_profile
+        )
+
         # Keep current runtime overwrite mode; update default based on new config's flag
         self.config = new_cfg
         self.overwrite_mode = self.config.overwrite_mode
         self.consecutive_mode = self.overwrite_mode
         setattr(self.config, "consecutive_mode", self.overwrite_mode)
         self.last_saved_paths = None
+        if rewarm:
+            threading.Thread(target=self._warm_ocr, name="snap-ocr-warmup", daemon=True).start()
+
+    def _warm_ocr(self) -> None:
+        """Load the configured language into the in-process engine (and pool workers when used)."""
+        cfg = self.config
+        profile = self._resolve_profile(self.capture_mode)
+        pipeline = self._profile_pipeline(profile)
+        try:
+            elapsed_ms = warm_up(self.ocr_backend, cfg.ocr_lang, cfg.tesseract_cmd, pipeline, profile.psm, profile.oem)
+            self.logger.info(
+                "OCR engine ready (%s, lang=%s, profile=%s) after %.0f ms warm-up",
+                self.ocr_backend.name,
+                cfg.ocr_lang,
+                profile.name,
+                elapsed_ms,
+            )
+            if cfg.ocr_parallel:
+                started = time.perf_counter()
+                ready = self.ocr_pool.warm(cfg.ocr_lang, pipeline, profile.psm, profile.oem, timeout=60)
+                self.logger.info(
+                    "OCR pool ready: %d/%d workers warmed in %.0f ms (lang=%s)",
+                    ready,
+                    self.ocr_pool.workers,
+                    (time.perf_counter() - started) * 1000.0,
+                    cfg.ocr_lang,
+                )
+        except Exception as exc:
+            # Warm-up is best effort; the first capture reports real problems to the user
+            self.logger.warning("OCR warm-up failed: %s", exc)
 
     def _enqueue_job(self, reason: str) -> None:
-        self.last_trigger_ts = time.monotonic()
-        self.worker_queue.put(Job(reason=reason, requested_at=time.monotonic()))
+        # Grab now so the saved frame is what was on screen at the key press, however busy OCR is
+        triggered = time.monotonic()
+        self.last_trigger_ts = triggered
+        mode = self.capture_mode
+        grabbed_at = time.time()
+        img = self._grab(mode)
+        if img is None:
+            return
+        self.logger.debug(
+            "%s trigger: grabbed %s×%s (%s) %.0f ms after trigger",
+            reason,
+            img.width,
+            img.height,
+            mode,
+            (time.monotonic() - triggered) * 1000.0,
+        )
+        self._enqueue_frame(reason, mode, img, triggered, grabbed_at)
+
+    def _enqueue_frame(
+        self,
+        reason: str,
+        mode: str,
+        image: Any,
+        requested_at: Optional[float] = None,
+        grabbed_at: Optional[float] = None,
+    ) -> None:
+        frame = self.frames.hold(image)
+        job = Job(
+            reason=reason,
+            requested_at=requested_at or time.monotonic(),
+            mode=mode,
+            frame=frame,
+            grabbed_at=grabbed_at or time.time(),
+        )
+        # Triggers come from the hotkey listener and tray threads, which must never block
+        if not self.pipeline.submit(CaptureTask(job=job)):
+            frame.discard()
+            self.logger.warning("Capture queue is full; %s trigger dropped", reason)
 
     def _is_debounced(self) -> bool:
         now = time.monotonic()
@@ -196,91 +422,60 @@ class App:
             return True
         return False
 
-    def _worker_loop(self) -> None:
-        while not self._stopping.is_set():
-            job = self.worker_queue.get()
-            if job is None:
-                break
-            try:
-                self._process_job(job)
-            except Exception as e:
-                # Unhandled errors get logged and surfaced
-                self._record_error(
-                    SnapOcrError(ErrorCode.OTHER, f"Unexpected error: {e}", e)
-                )
+    def _build_pipeline(self) -> StagedPipeline:
+        workers = self.config.pipeline_workers
+        return StagedPipeline(
+            [
+                ("capture", self._step_capture, workers.get("capture", 1)),
+                ("ocr", self._step_ocr, workers.get("ocr", 1)),
+                # Single writer, fed in capture order: overwrite mode and last_saved_paths rely on it
+                ("write", self._step_write, 1),
+            ],
+            queue_size=self.config.pipeline_queue_size,
+            intake_size=self.config.frame_queue_max_frames,
+            on_error=self._on_stage_error,
+        )
+
+    def _on_stage_error(self, stage: str, exc: BaseException) -> None:
+        # Unhandled errors get logged and surfaced
+        self._record_error(SnapOcrError(ErrorCode.OTHER, f"Unexpected error in {stage} stage: {exc}", exc))
 
     def _process_job(self, job: Job) -> Optional[Tuple[str, str]]:
-        logger = self.logger
+        """Run one job through every stage on the calling thread (used by --capture-once)."""
+        task: Optional[CaptureTask] = CaptureTask(job=job)
+        for step in (self._step_capture, self._step_ocr, self._step_write):
+            task = step(task)
+            if task is None:
+                return None
+        return task.img_path, task.txt_path
+
+    def _step_capture(self, task: CaptureTask) -> Optional[CaptureTask]:
         cfg = self.config
+        job = task.job
+        started = time.perf_counter()
 
         # Ensure output dirs
         ensure_dir(cfg.save_dir_images)
         ensure_dir(cfg.save_dir_text)
 
         # Resolve capture
-        mode = getattr(self, "capture_mode", "full")
-        # Capture
-        try:
-            if mode == "full":
-                img = capture_full_screenshot()
-            elif mode == "region":
-                r = getattr(self.config, "region", {"left": 100, "top": 100, "width": 1280, "height": 720})
-                img = capture_region(int(r["left"]), int(r["top"]), int(r["width"]), int(r["height"]))
-            elif mode == "fancyzones":
-                # Defer import to avoid Windows-only dependency at import time
-                from .region_capture import get_fancyzones_region
-                region = get_fancyzones_region(
-                    prefer_under_cursor=getattr(self.config, "fancyzones_prefer_under_cursor", True),
-                    zone_index=getattr(self.config, "fancyzones_zone_index", 0),
-                )
-                if not region:
-                    raise SnapOcrError(ErrorCode.CAPTURE_FAILED, "No FancyZones region available (cursor not in zone?)")
-                img = capture_region(region["left"], region["top"], region["width"], region["height"])
-            elif mode == "macsyzones":
-                from .region_capture import get_macsyzones_region
-
-                region = get_macsyzones_region(
-                    prefer_under_cursor=getattr(self.config, "macsyzones_prefer_under_cursor", True),
-                    zone_index=getattr(self.config, "macsyzones_zone_index", 0),
-                    layout_name=getattr(self.config, "macsyzones_layout_name", None),
-                )
-                if not region:
-                    raise SnapOcrError(
-                        ErrorCode.CAPTURE_FAILED,
-                        "No MacsyZones region available. Ensure MacsyZones is installed and a layout is assigned to this display.",
-                    )
-                logger.debug(
-                    "MacsyZones resolved region: left=%s top=%s width=%s height=%s (layout=%s prefer=%s index=%s)",
-                    region.get("left"),
-                    region.get("top"),
-                    region.get("width"),
-                    region.get("height"),
-                    getattr(self.config, "macsyzones_layout_name", None),
-                    getattr(self.config, "macsyzones_prefer_under_cursor", True),
-                    getattr(self.config, "macsyzones_zone_index", 0),
-                )
-                img = capture_region(region["left"], region["top"], region["width"], region["height"])
-                logger.debug("Captured region image size: %s×%s", *img.size)
-            else:
-                img = capture_full_screenshot()
-        except SnapOcrError as se:
-            self._record_error(se)
-            return
-        except Exception as e:
-            # Likely permissions on macOS or unknown capture failure
-            msg = self._mac_screenshot_help() if sys.platform == "darwin" else "Screen capture failed."
-            self._record_error(SnapOcrError(ErrorCode.CAPTURE_FAILED, f"{msg} Details: {e}", e))
-            return
+        mode = job.mode or getattr(self, "capture_mode", "full")
+        task.mode = mode
+        # Triggers hand over the frame they grabbed; --capture-once grabs here
+        if job.frame is not None:
+            img = job.frame.load()
+            job.frame = None
+        else:
+            img = self._grab(mode)
+            if img is None:
+                return None
+        task.image = img
 
-        # File naming
+        # File naming: the grab time, not when this stage got to the frame (they differ under a backlog)
         pattern = getattr(cfg, "filename_pattern", "{base}_{timestamp}") or "{base}_{timestamp}"
-        timestamp_token = build_timestamped_name()
-        context = {
-            "base": cfg.base_filename,
-            "timestamp": timestamp_token,
-        }
+        when = time.localtime(job.grabbed_at) if job.grabbed_at is not None else time.localtime()
         try:
-            stem_raw = pattern.format(**context)
+            stem_raw = format_stem(pattern, cfg.base_filename, when)
         except KeyError as exc:
             self._record_error(
                 SnapOcrError(
@@ -289,78 +484,522 @@ class App:
                     exc,
                 )
             )
-            return
+            return None
         except Exception as exc:
             self._record_error(
                 SnapOcrError(ErrorCode.CONFIG_INVALID, f"Invalid filename_pattern: {exc}", exc)
             )
-            return
+            return None
 
-        stem = stem_raw.strip() or f"{cfg.base_filename}_{timestamp_token}"
+        task.stem = stem_raw.strip() or format_stem("{base}_{timestamp}", cfg.base_filename, when)
+        task.img_path = os.path.join(cfg.save_dir_images, f"{task.stem}.{IMAGE_FORMATS[cfg.image_format.upper()]}")
+        task.txt_path = os.path.join(cfg.save_dir_text, f"{task.stem}.txt")
+        if os.sep in task.stem:
+            # Sharded layout: the day's (or hour's) folders are created by its first capture
+            ensure_dir(os.path.dirname(task.img_path))
+            ensure_dir(os.path.dirname(task.txt_path))
+        if not self._match_duplicate(task):
+            return None
+        task.timings["capture"] = time.perf_counter() - started
+        if task.duplicate_kind != "exact":
+            self._submit_encode(task)
+        return task
 
-        img_path = os.path.join(cfg.save_dir_images, f"{stem}.png")
-        txt_path = os.path.join(cfg.save_dir_text, f"{stem}.txt")
+    def _submit_encode(self, task: CaptureTask) -> None:
+        # Encoding is off the critical path: OCR starts on the same frame right away. The
+        # frame is bound here, because the OCR stage drops task.image before a backed-up
+        # encoder gets to it.
+        cfg = self.config
+        task.encoding = self.encoder.submit(
+            self._encode, task.image, task, cfg.image_format, cfg.png_compress_level, cfg.png_encoder.lower()
+        )
 
-        self._clear_previous_outputs_if_needed()
+    def _match_duplicate(self, task: CaptureTask) -> bool:
+        """
+        Look the frame up among recent captures. Exact and `link_text` near matches are marked
+        on the task for the write stage; returns False for a near-duplicate that is skipped.
+        """
+        cfg = self.config
+        if not cfg.dedup_exact and not cfg.dedup_similarity_bits:
+            return True
+        img = task.image
+        profile = self._resolve_profile(task.mode)
+        key = "|".join((cfg.ocr_lang, profile.name, cfg.image_format.upper(), ",".join(cfg.ocr_outputs)))
+        task.digest = pixel_digest(img)
+        if cfg.dedup_exact:
+            entry = self.dedup.find_exact(task.digest, key)
+            if entry is not None:
+                task.duplicate, task.duplicate_kind = entry, "exact"
+                return True
+        phash = 0
+        if cfg.dedup_similarity_bits:
+            phash = dhash(img)
+            match = self.dedup.find_similar(phash, img.size, key, cfg.dedup_similarity_bits)
+            if match is not None:
+                entry, distance = match
+                if cfg.dedup_near_action == "skip":
+                    self.dedup.record_saved("near", files_size(entry.files()), ocr_skipped=True)
+                    self.logger.info("Skipped near-duplicate capture (%d bits from %s)", distance, entry.img_path)
+                    return False
+                task.duplicate, task.duplicate_kind = entry, "near"
+        # Remembered now so a repeat queued behind this capture can link to it once it is written
+        self.dedup.add(
+            SavedCapture(
+                digest=task.digest,
+                phash=phash,
+                size=img.size,
+                key=key,
+                img_path=task.img_path,
+                txt_path=task.txt_path,
+                extra_paths=self._extra_output_paths(task.stem),
+            )
+        )
+        return True
 
-        # Save image atomically
+    def _extra_output_paths(self, stem: str) -> List[str]:
+        return [
+            os.path.join(self.config.save_dir_text, f"{stem}.{OUTPUT_EXTENSIONS[fmt]}")
+            for fmt in self.config.ocr_outputs
+            if fmt != "txt"
+        ]
+
+    def _encode(
+        self, image: Any, task: CaptureTask, fmt: str, png_compress_level: int, png_encoder: str
+    ) -> Union[bytes, memoryview]:
+        started = time.perf_counter()
+        outcome = "failed"
         try:
-            # Always save as PNG for consistency (config.image_format included for extensibility)
-            from io import BytesIO
-            buf = BytesIO()
-            img.save(buf, format=cfg.image_format)
-            atomic_write_bytes(img_path, buf.getvalue())
-        except PermissionError as e:
-            self._record_error(
-                SnapOcrError(ErrorCode.SAVE_PERMISSION, f"Permission denied writing image: {img_path}", e)
-            )
-            return
-        except Exception as e:
-            self._record_error(
-                SnapOcrError(ErrorCode.OTHER, f"Failed to save image: {e}", e)
-            )
-            return
+            data = encode_image(image, fmt, png_compress_level, png_encoder)
+            outcome = "ok"
+            return data
+        finally:
+            elapsed = time.perf_counter() - started
+            task.timings["encode"] = elapsed
+            self.encode_metrics.record(elapsed, outcome, 0)
 
-        # OCR
+    def _step_ocr(self, task: CaptureTask) -> Optional[CaptureTask]:
+        if task.duplicate is not None:
+            # Text comes from the earlier capture; the frame is kept in case its files are gone by then
+            return task
+        started = time.perf_counter()
         try:
-            text = perform_ocr(img, cfg.ocr_lang, cfg.tesseract_cmd)
+            task.text, task.documents = self._run_ocr_outputs(task.image, task.mode)
         except SnapOcrError as se:
-            self._record_error(se)
-            return
+            task.error = se
         except Exception as e:
-            self._record_error(
-                SnapOcrError(ErrorCode.OCR_FAILED, build_ocr_failed_message(e), e)
-            )
-            return
+            task.error = SnapOcrError(ErrorCode.OCR_FAILED, build_ocr_failed_message(e), e)
+        task.image = None  # a queued encode holds the frame it was submitted with
+        task.timings["ocr"] = time.perf_counter() - started
+        return task
 
-        # Save text atomically
-        try:
-            atomic_write_text(txt_path, text, encoding="utf-8")
-        except PermissionError as e:
-            self._record_error(
-                SnapOcrError(ErrorCode.SAVE_PERMISSION, f"Permission denied writing text: {txt_path}", e)
-            )
-            return
-        except Exception as e:
-            self._record_error(
-                SnapOcrError(ErrorCode.OTHER, f"Failed to save text: {e}", e)
+    def _step_write(self, task: CaptureTask) -> Optional[CaptureTask]:
+        logger = self.logger
+        cfg = self.config
+        img_path, txt_path = task.img_path, task.txt_path
+        started = time.perf_counter()
+
+        # Duplicates link to the earlier files before overwrite mode may delete them
+        linked = self._link_duplicate(task) if task.duplicate is not None else []
+        # Read the linked text's index entry now: in overwrite mode the clearing below drops it
+        linked_text = None
+        if task.text_source is not None and self.search_index is not None:
+            linked_text = self.search_index.text_of(task.text_source)
+
+        self._clear_previous_outputs_if_needed(keep=tuple(linked))
+
+        # Queue the image (also when OCR failed, as before); the writer publishes it atomically
+        if task.encoding is not None:
+            try:
+                encoded = task.encoding.result()
+                task.encoding = None
+            except Exception as e:
+                self.dedup.forget(task.digest)
+                self._record_error(
+                    SnapOcrError(ErrorCode.OTHER, f"Failed to encode image: {e}", e)
+                )
+                return None
+            self.writer.write(img_path, encoded)
+            del encoded
+
+        if task.error is not None:
+            self.dedup.forget(task.digest)
+            self._record_error(task.error)
+            return None
+
+        if txt_path not in linked:
+            self.writer.write(txt_path, task.text)
+
+        # Extra renderer outputs (TSV/hOCR/ALTO/PDF) from the same engine pass
+        extra_paths: List[str] = [p for p in linked if p not in (img_path, txt_path)]
+        for fmt, data in task.documents.items():
+            doc_path = os.path.join(cfg.save_dir_text, f"{task.stem}.{OUTPUT_EXTENSIONS[fmt]}")
+            self.writer.write(doc_path, data)
+            extra_paths.append(doc_path)
+        if self.writer.waits_for_disk and not self.writer.flush(STRICT_FLUSH_TIMEOUT_S):
+            self.logger.warning("Capture files not on disk after %.0f s; continuing", STRICT_FLUSH_TIMEOUT_S)
+        if self.search_index is not None:
+            self.search_index.add(
+                txt_path,
+                img_path,
+                task.job.grabbed_at or time.time() - (time.monotonic() - task.job.requested_at),
+                task.mode,
+                json.dumps(named_regions(cfg.region)) if task.mode == "region" else "",
+                text=linked_text if txt_path in linked else task.text,
             )
-            return
+        task.timings["write"] = time.perf_counter() - started
 
         # Success
         logger.info("Saved: %s and %s", img_path, txt_path)
+        if extra_paths:
+            logger.info("Saved OCR outputs: %s", ", ".join(extra_paths))
+        logger.debug(
+            "Job %s: %s, %.0f ms end to end",
+            task.job.reason,
+            ", ".join(f"{name} {secs * 1000:.0f} ms" for name, secs in task.timings.items()),
+            (time.monotonic() - task.job.requested_at) * 1000.0,
+        )
         if self.config.notify_on_success:
             self._notify("Snap OCR", f"Saved screenshot + OCR:\n{img_path}\n{txt_path}")
 
-        self.last_saved_paths = (img_path, txt_path)
+        self.last_saved_paths = (img_path, txt_path, *extra_paths)
         if self.tray is not None:
             try:
-                if os.path.isfile(img_path) and os.path.isfile(txt_path):
+                if self.writer.exists(img_path) and self.writer.exists(txt_path):
                     self.tray.flash_success()
             except Exception as exc:
                 logger.debug("Failed to flash tray success icon: %s", exc)
 
-        return img_path, txt_path
+        return task
+
+    def _link_duplicate(self, task: CaptureTask) -> List[str]:
+        """
+        Hardlink the earlier capture's files under this capture's names and return the new paths.
+        When they are gone (overwrite mode, manual deletes, a failed save) the skipped encode/OCR
+        runs here instead and nothing is linked.
+        """
+        source = task.duplicate
+        exact = task.duplicate_kind == "exact"
+        task.duplicate = None
+        if exact:
+            # Newest names become the link target, so overwrite mode can delete the old ones
+            self.dedup.add(
+                SavedCapture(
+                    digest=source.digest,
+                    phash=source.phash,
+                    size=source.size,
+                    key=source.key,
+                    img_path=task.img_path,
+                    txt_path=task.txt_path,
+                    extra_paths=self._extra_output_paths(task.stem),
+                )
+            )
+        if not source.on_disk(text_only=not exact, exists=self.writer.exists):
+            self.logger.debug("Duplicate source %s is gone; processing capture normally", source.img_path)
+            if task.encoding is None:
+                # Submitted with the frame itself: _step_ocr below drops task.image before a
+                # busy encoder would get to it
+                self._submit_encode(task)
+            self._step_ocr(task)
+            return []
+
+        task.text_source = source.txt_path
+        pairs = [(source.txt_path, task.txt_path)]
+        pairs += list(zip(source.extra_paths, self._extra_output_paths(task.stem)))
+        if exact:
+            pairs.insert(0, (source.img_path, task.img_path))
+        for src, dst in pairs:
+            self.writer.link(src, dst)
+        task.image = None
+
+        # Sources still queued in the writer are not counted; the figure errs low
+        self.dedup.record_saved(task.duplicate_kind, files_size([src for src, _ in pairs]), ocr_skipped=True)
+        self.logger.info(
+            "%s duplicate of %s: linked %d files",
+            "Exact" if exact else "Near",
+            source.img_path,
+            len(pairs),
+        )
+        return [dst for _, dst in pairs]
+
+    def _grab(self, mode: str):
+        """Capture with errors recorded for the user; None when the grab failed."""
+        try:
+            return self._capture(mode)
+        except SnapOcrError as se:
+            self._record_error(se)
+        except Exception as e:
+            # Likely permissions on macOS or unknown capture failure
+            msg = self._mac_screenshot_help() if sys.platform == "darwin" else "Screen capture failed."
+            self._record_error(SnapOcrError(ErrorCode.CAPTURE_FAILED, f"{msg} Details: {e}", e))
+        return None
+
+    def _capture(self, mode: str):
+        """Grab the current capture target as an RGB image; raises SnapOcrError on failure."""
+        logger = self.logger
+        if mode == "full":
+            return self.capture.full()
+        elif mode == "region":
+            # Several named regions come from one grab of their bounding box, cropped at OCR time
+            r = regions_bbox(named_regions(self.config.region))
+            return self.capture.region(r["left"], r["top"], r["width"], r["height"])
+        elif mode == "monitor_under_cursor" or mode.startswith("monitor:"):
+            return self._capture_monitor(mode)
+        elif mode == "fancyzones":
+            # Defer import to avoid Windows-only dependency at import time
+            from .region_capture import get_fancyzones_region
+            region = get_fancyzones_region(
+                prefer_under_cursor=getattr(self.config, "fancyzones_prefer_under_cursor", True),
+                zone_index=getattr(self.config, "fancyzones_zone_index", 0),
+                monitors=self.capture.monitors(),
+            )
+            if not region:
+                raise SnapOcrError(ErrorCode.CAPTURE_FAILED, "No FancyZones region available (cursor not in zone?)")
+            return self.capture.region(region["left"], region["top"], region["width"], region["height"])
+        elif mode == "macsyzones":
+            from .region_capture import get_macsyzones_region
+
+            region = get_macsyzones_region(
+                prefer_under_cursor=getattr(self.config, "macsyzones_prefer_under_cursor", True),
+                zone_index=getattr(self.config, "macsyzones_zone_index", 0),
+                layout_name=getattr(self.config, "macsyzones_layout_name", None),
+                monitors=self.capture.monitors(),
+            )
+            if not region:
+                raise SnapOcrError(
+                    ErrorCode.CAPTURE_FAILED,
+                    "No MacsyZones region available. Ensure MacsyZones is installed and a layout is assigned to this display.",
+                )
+            logger.debug(
+                "MacsyZones resolved region: left=%s top=%s width=%s height=%s (layout=%s prefer=%s index=%s)",
+                region.get("left"),
+                region.get("top"),
+                region.get("width"),
+                region.get("height"),
+                getattr(self.config, "macsyzones_layout_name", None),
+                getattr(self.config, "macsyzones_prefer_under_cursor", True),
+                getattr(self.config, "macsyzones_zone_index", 0),
+            )
+            img = self.capture.region(region["left"], region["top"], region["width"], region["height"])
+            logger.debug("Captured region image size: %s×%s", *img.size)
+            return img
+        else:
+            return self.capture.full()
+
+    def _capture_monitor(self, mode: str):
+        """Grab a single display so capture, encode and OCR scale with one monitor, not the desktop."""
+        from .region_capture import _get_cursor_pos, _get_monitor_under_point_with_index
+
+        monitors = self.capture.monitors()
+        if mode == "monitor_under_cursor":
+            found = _get_monitor_under_point_with_index(*_get_cursor_pos(), monitors=monitors)
+            if found is None:
+                raise SnapOcrError(ErrorCode.CAPTURE_FAILED, "No monitor found under the cursor.")
+            index, monitor = found
+        else:
+            index = int(mode.split(":", 1)[1])
+            physical = monitors[1:] or monitors[:1]
+            if index >= len(physical):
+                raise SnapOcrError(
+                    ErrorCode.CAPTURE_FAILED,
+                    f"capture_mode {mode} refers to a missing display; {len(physical)} detected (monitor:0 is the first).",
+                )
+            monitor = physical[index]
+        self.logger.debug("Capturing monitor %d: %s", index, monitor)
+        return self.capture.region(monitor["left"], monitor["top"], monitor["width"], monitor["height"])
+
+    def _run_ocr(self, img, mode: str) -> str:
+        cfg = self.config
+        profile = self._resolve_profile(mode)
+        pipeline = self._profile_pipeline(profile)
+        psm, oem = profile.psm, profile.oem
+        if cfg.incremental_ocr:
+            return self.incremental_ocr.run(
+                img,
+                (mode, img.size, profile.name),
+                lambda frame: perform_ocr_lines(
+                    frame,
+                    cfg.ocr_lang,
+                    cfg.tesseract_cmd,
+                    backend=self.ocr_backend,
+                    pipeline=pipeline,
+                    psm=psm,
+                    oem=oem,
+                ),
+            )
+
+        tiles = None
+        if cfg.text_detect:
+            regions = find_text_regions(img)
+            if regions is not None:
+                tiles = region_tiles(img, regions)
+        if tiles is None and cfg.ocr_parallel and mode == "full":
+            monitors = self.capture.monitors()
+            tiles = monitor_tiles(img, monitors[0], monitors[1:] or monitors[:1])
+        if tiles and (len(tiles) > 1 or cfg.text_detect):
+            started = time.perf_counter()
+            if cfg.ocr_parallel and len(tiles) > 1:
+                text = ocr_tiles(self.ocr_pool, tiles, cfg.ocr_lang, pipeline, psm, oem)
+            else:
+                text = ocr_tiles_inline(self.ocr_backend, tiles, cfg.ocr_lang, cfg.tesseract_cmd, pipeline, psm, oem)
+            self.logger.debug(
+                "OCR of %d tiles (%.0f%% of frame) took %.0f ms",
+                len(tiles),
+                100.0 * sum(t.width * t.height for t, _ in tiles) / float(img.width * img.height),
+                (time.perf_counter() - started) * 1000.0,
+            )
+            return text
+        return perform_ocr(
+            img,
+            cfg.ocr_lang,
+            cfg.tesseract_cmd,
+            backend=self.ocr_backend,
+            cache=self.ocr_cache,
+            pipeline=pipeline,
+            psm=psm,
+            oem=oem,
+        )
+
+    def _run_ocr_outputs(self, img, mode: str) -> Tuple[str, Dict[str, bytes]]:
+        """
+        Text plus any extra `ocr_outputs` renderers. Extras need word boxes for the whole frame,
+        so they take a single full-frame pass instead of the tile/incremental paths.
+        """
+        cfg = self.config
+        regions = named_regions(cfg.region) if mode == "region" else []
+        if len(regions) > 1:
+            text = self._run_region_ocr(img, mode, regions)
+            if not any(fmt != "txt" for fmt in cfg.ocr_outputs):
+                return text, {}
+            # Renderer outputs cover the whole grab so word boxes keep one coordinate space
+            profile = self._resolve_profile(mode)
+            _, documents = perform_ocr_outputs(
+                img,
+                cfg.ocr_lang,
+                cfg.ocr_outputs,
+                cfg.tesseract_cmd,
+                backend=self.ocr_backend,
+                cache=self.ocr_cache,
+                pipeline=self._profile_pipeline(profile),
+                psm=profile.psm,
+                oem=profile.oem,
+            )
+            return text, documents
+        if not any(fmt != "txt" for fmt in cfg.ocr_outputs):
+            return self._run_ocr(img, mode), {}
+        profile = self._resolve_profile(mode)
+        return perform_ocr_outputs(
+            img,
+            cfg.ocr_lang,
+            cfg.ocr_outputs,
+            cfg.tesseract_cmd,
+            backend=self.ocr_backend,
+            cache=self.ocr_cache,
+            pipeline=self._profile_pipeline(profile),
+            psm=profile.psm,
+            oem=profile.oem,
+        )
+
+    def _run_region_ocr(self, img, mode: str, regions: List[Dict[str, Any]]) -> str:
+        """
+        OCR each named region of a bounding-box grab on its own, concurrently (on the process
+        pool with `ocr_parallel`, else on threads) and return one text with a `[name]` header
+        per region, in config order.
+        """
+        cfg = self.config
+        profile = self._resolve_profile(mode)
+        pipeline = self._profile_pipeline(profile)
+        named = named_region_tiles(img, regions_bbox(regions), regions)
+        started = time.perf_counter()
+        if cfg.ocr_parallel:
+            tiles = [tile for _, tile in named]
+            texts = ocr_tiles_each(self.ocr_pool, tiles, cfg.ocr_lang, pipeline, profile.psm, profile.oem)
+        else:
+            # No process pool: one thread per region on the in-process engine (tesseract
+            # releases the GIL while recognising, so regions still OCR side by side)
+            def run(tile: Any) -> str:
+                return perform_ocr(
+                    tile,
+                    cfg.ocr_lang,
+                    cfg.tesseract_cmd,
+                    backend=self.ocr_backend,
+                    cache=self.ocr_cache,
+                    pipeline=pipeline,
+                    psm=profile.psm,
+                    oem=profile.oem,
+                )
+
+            workers = min(len(named), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="snap-ocr-region") as threads:
+                texts = list(threads.map(run, [tile for _, (tile, _offset) in named]))
+        self.logger.debug("OCR of %d regions took %.0f ms", len(named), (time.perf_counter() - started) * 1000.0)
+        return "\n".join(f"[{name}]\n{text.rstrip()}\n" for (name, _), text in zip(named, texts))
+
+    def _resolve_profile(self, mode: str) -> OcrProfile:
+        name = self.config.ocr_profiles_by_mode.get(mode) or self.ocr_profile
+        return resolve_profile(self.ocr_profiles, name, self.calibration)
+
+    def _profile_pipeline(self, profile: OcrProfile) -> Pipeline:
+        pipeline = self._profile_pipelines.get(profile.name)
+        if pipeline is None:
+            pipeline = profile.pipeline(self.preprocess)
+            self._profile_pipelines[profile.name] = pipeline
+        return pipeline
+
+    def _build_ocr_cache(self, cfg: Config) -> Optional[OcrCache]:
+        if not cfg.ocr_cache:
+            return None
+        try:
+            return OcrCache(os.path.join(get_state_dir(), CACHE_FILENAME), cfg.ocr_cache_max_mb * 1024 * 1024)
+        except Exception as exc:
+            # The cache is an optimisation; never block captures on it
+            self.logger.warning("OCR cache disabled: %s", exc)
+            return None
+
+    def _close_ocr_cache(self) -> None:
+        cache = self.ocr_cache
+        self.ocr_cache = None
+        if cache is not None:
+            self.logger.info("OCR cache stats: %s", cache.stats())
+            cache.close()
+
+    def _build_search_index(self, cfg: Config) -> Optional[SearchIndex]:
+        if not cfg.search_index:
+            return None
+        try:
+            return SearchIndex(os.path.join(get_state_dir(), INDEX_FILENAME))
+        except Exception as exc:
+            # Captures are still saved as files; --reindex can catch the index up later
+            self.logger.warning("Search index disabled: %s", exc)
+            return None
+
+    def _build_retention(self, cfg: Config) -> RetentionService:
+        return RetentionService(
+            cfg.save_dir_images,
+            cfg.save_dir_text,
+            CaptureNames(cfg.filename_pattern, cfg.base_filename),
+            archive_after_days=cfg.retention_archive_after_days,
+            max_total_bytes=cfg.retention_max_total_mb * 1024 * 1024,
+            interval_s=cfg.retention_interval_minutes * 60.0,
+            index=lambda: self.search_index,
+        )
+
+    @staticmethod
+    def _retention_settings(cfg: Config) -> Tuple[Any, ...]:
+        return (
+            cfg.save_dir_images,
+            cfg.save_dir_text,
+            cfg.filename_pattern,
+            cfg.base_filename,
+            cfg.retention_archive_after_days,
+            cfg.retention_max_total_mb,
+            cfg.retention_interval_minutes,
+        )
+
+    def _close_search_index(self) -> None:
+        index = self.search_index
+        self.search_index = None
+        if index is not None:
+            index.close()
 
     def _record_error(self, err: SnapOcrError) -> None:
         # Human-readable, actionable messages
@@ -369,23 +1008,27 @@ class App:
         self.logger.error(msg)
         self._notify("Snap OCR Error", msg)
 
-    def _clear_previous_outputs_if_needed(self) -> None:
+    def _clear_previous_outputs_if_needed(self, keep: Tuple[str, ...] = ()) -> None:
         if not self.overwrite_mode:
             return
         last = self.last_saved_paths
         if not last:
             return
         for path in last:
-            if not path:
+            if not path or path in keep:
                 continue
-            try:
-                if os.path.exists(path):
-                    os.remove(path)
-                    self.logger.debug("Removed previous output: %s", path)
-            except Exception as exc:
-                self.logger.warning("Failed to remove previous output %s: %s", path, exc)
+            # Queued behind the files' own writes, so still-pending outputs are removed too
+            self.writer.remove(path)
+            if self.search_index is not None and path.endswith(".txt"):
+                self.search_index.remove(path)
         self.last_saved_paths = None
 
+    def _on_write_error(self, path: str, exc: BaseException) -> None:
+        if isinstance(exc, PermissionError):
+            self._record_error(SnapOcrError(ErrorCode.SAVE_PERMISSION, f"Permission denied writing {path}", exc))
+        else:
+            self._record_error(SnapOcrError(ErrorCode.OTHER, f"Failed to save {path}: {exc}", exc))
+
     def _notify(self, title: str, message: str) -> None:
         # All OS notifications are disabled to keep the tool distraction-free.
         return
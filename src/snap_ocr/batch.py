@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+
+from .ocr_pool import OcrProcessPool
+from .paths import ensure_dir, get_state_dir
+from .preprocess import Pipeline
+from .profiles import IMAGE_EXTENSIONS, OcrProfile
+
+
+logger = logging.getLogger(__name__)
+
+_IN_FLIGHT_PER_WORKER = 4  # queued tasks per worker; keeps memory flat on huge trees
+_REPORT_INTERVAL_S = 5.0
+
+
+@dataclass
+class BatchStats:
+    done: int = 0
+    skipped: int = 0  # already in the manifest from an earlier run
+    failed: int = 0
+    started: float = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return max(1e-9, time.monotonic() - self.started)
+
+    @property
+    def images_per_second(self) -> float:
+        return self.done / self.elapsed
+
+    def summary(self) -> str:
+        return (
+            f"{self.done} OCRed, {self.skipped} already done, {self.failed} failed "
+            f"in {self.elapsed:.1f}s ({self.images_per_second:.2f} images/s)"
+        )
+
+
+def iter_images(root: str) -> Iterator[str]:
+    """Image files under `root`, depth-first in name order, without listing the whole tree up front."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(dirpath, name)
+
+
+def text_output_path(path: str, root: str, out_dir: Optional[str]) -> str:
+    """Sidecar `.txt` next to the image, or the same relative path under `out_dir`."""
+    stem = os.path.splitext(path)[0]
+    if out_dir is None:
+        return stem + ".txt"
+    return os.path.join(out_dir, os.path.relpath(stem, root) + ".txt")
+
+
+class BatchManifest:
+    """
+    Append-only JSON-lines record of finished images, keyed by path, size and mtime so
+    edited files are redone. One manifest per (root, output, language, profile), so a
+    language or profile change starts a fresh pass instead of skipping everything.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._done: Set[Tuple[str, int, int]] = set()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from an interrupted run
+                    if entry.get("ok"):
+                        self._done.add((entry["path"], entry["size"], entry["mtime_ns"]))
+        except OSError:
+            pass
+        self._file = open(path, "a", encoding="utf-8")
+
+    @staticmethod
+    def for_run(root: str, out_dir: Optional[str], lang: str, engine_key: str) -> "BatchManifest":
+        ident = json.dumps([os.path.abspath(root), out_dir and os.path.abspath(out_dir), lang, engine_key])
+        digest = hashlib.blake2b(ident.encode("utf-8"), digest_size=8).hexdigest()
+        directory = os.path.join(get_state_dir(), "batch")
+        ensure_dir(directory)
+        return BatchManifest(os.path.join(directory, f"{digest}.jsonl"))
+
+    def is_done(self, rel: str, st: os.stat_result) -> bool:
+        return (rel, st.st_size, st.st_mtime_ns) in self._done
+
+    def record(self, rel: str, st: os.stat_result, ok: bool) -> None:
+        entry = {"path": rel, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "ok": ok}
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()  # every finished image survives an interrupt
+        if ok:
+            self._done.add((rel, st.st_size, st.st_mtime_ns))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def run_batch(
+    root: str,
+    lang: str,
+    pool: OcrProcessPool,
+    profile: OcrProfile,
+    default_pipeline: Pipeline,
+    out_dir: Optional[str] = None,
+    progress: Optional[Callable[[BatchStats], None]] = None,
+) -> BatchStats:
+    """
+    OCR every image under `root` on the process pool, writing `.txt` files atomically.
+    Resumable: images recorded in the run's manifest are skipped. `progress` is called
+    periodically and once at the end.
+    """
+    pipeline = profile.pipeline(default_pipeline)
+    engine_key = f"{profile.name}|psm={profile.psm}|oem={profile.oem}|{pipeline.signature}"
+    manifest = BatchManifest.for_run(root, out_dir, lang, engine_key)
+    logger.info("Batch OCR of %s (manifest %s, %d workers)", root, manifest.path, pool.workers)
+    stats = BatchStats(started=time.monotonic())
+    pending: Dict[Future, Tuple[str, str, os.stat_result]] = {}
+    max_in_flight = pool.workers * _IN_FLIGHT_PER_WORKER
+    last_report = stats.started
+
+    def drain(block_until: int) -> None:
+        nonlocal last_report
+        while len(pending) > block_until:
+            finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in finished:
+                path, rel, st = pending.pop(future)
+                try:
+                    future.result()
+                except Exception as exc:
+                    stats.failed += 1
+                    manifest.record(rel, st, ok=False)
+                    logger.warning("Batch OCR failed for %s: %s", path, exc)
+                else:
+                    stats.done += 1
+                    manifest.record(rel, st, ok=True)
+        now = time.monotonic()
+        if progress is not None and now - last_report >= _REPORT_INTERVAL_S:
+            last_report = now
+            progress(stats)
+
+    try:
+        for path in iter_images(root):
+            rel = os.path.relpath(path, root)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if manifest.is_done(rel, st):
+                stats.skipped += 1
+                continue
+            out_path = text_output_path(path, root, out_dir)
+            ensure_dir(os.path.dirname(out_path) or ".")
+            future = pool.submit_file(path, out_path, lang, pipeline, profile.psm, profile.oem)
+            pending[future] = (path, rel, st)
+            drain(max_in_flight)
+        drain(0)
+    finally:
+        manifest.close()
+    logger.info("Batch OCR finished: %s", stats.summary())
+    if progress is not None:
+        progress(stats)
+    return stats
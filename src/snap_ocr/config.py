@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import os
+import re
 from dataclasses import dataclass, field
 from string import Formatter
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Union
 
 import yaml
 
@@ -14,13 +15,16 @@ from .paths import (
     get_config_path,
     ensure_dir,
 )
+from .layout import FILENAME_FIELDS, validate_pattern
+from .preprocess import DEFAULT_PREPROCESS, Pipeline
+from .profiles import load_profiles
 
 
 class ConfigValidationError(ValueError):
     """Raised when the configuration file fails validation."""
 
 
-_ALLOWED_FILENAME_FIELDS = {"base", "timestamp"}
+_ALLOWED_FILENAME_FIELDS = FILENAME_FIELDS
 
 
 @dataclass
@@ -36,10 +40,47 @@ class Config:
     debounce_ms: int
     log_level: str
     tesseract_cmd: Optional[str] = None
+    png_compress_level: int = 6  # 0-9; 1 encodes much faster for slightly larger files
+    png_encoder: str = "auto"  # "auto" | "pillow" | "parallel" (row bands deflated on all cores)
+    ocr_backend: str = "auto"  # "auto" | "tesserocr" | "pytesseract"
+    ocr_parallel: bool = False  # split full-screen captures per monitor and OCR tiles on a process pool
+    ocr_workers: int = 0  # 0 = one per CPU core
+    ocr_warmup: bool = True  # load the language and run a tiny recognition before arming the hotkey
+    ocr_cache: bool = True  # reuse stored text for pixel-identical captures
+    ocr_cache_max_mb: int = 64
+    search_index: bool = True  # add every capture's text to the FTS5 index behind `snap-ocr --search`
+    incremental_ocr: bool = False  # only re-OCR content bands that changed since the last capture
+    text_detect: bool = False  # crop OCR input to detected text regions
+    preprocess: List[Any] = field(default_factory=lambda: list(DEFAULT_PREPROCESS))
+    ocr_profile: str = "balanced"  # "fast" | "balanced" | "accurate" | custom | "auto" (from --calibrate)
+    ocr_profiles_by_mode: Dict[str, str] = field(default_factory=dict)  # e.g. {"full": "fast"}
+    ocr_profiles: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # custom profile definitions
+    calibration_budget_ms: int = 1500
+    calibration_samples: int = 12
+    ocr_outputs: List[str] = field(default_factory=lambda: ["txt"])  # plus any of "tsv" | "hocr" | "alto" | "pdf"
     # Capture options
     filename_pattern: str = "{base}_{timestamp}"
-    capture_mode: str = "full"  # "full" | "region" | "fancyzones" | "macsyzones"
-    region: Dict[str, int] = field(default_factory=lambda: {"left": 100, "top": 100, "width": 1280, "height": 720})
+    frame_queue_max_mb: int = 256  # frames grabbed at trigger time kept in RAM; the rest spill to temp files
+    frame_queue_max_frames: int = 32  # triggers beyond this many waiting frames are dropped
+    pipeline_queue_size: int = 4  # jobs buffered between stages before the previous stage waits
+    pipeline_workers: Dict[str, int] = field(default_factory=dict)  # per stage: capture | encode | ocr
+    watch_interval_ms: int = 1000  # watch mode sampling period
+    watch_threshold: float = 0.0003  # share of (downsampled) pixels that must change to trigger OCR
+    watch_cpu_budget: float = 0.25  # max share of one core spent sampling; stretches the interval
+    watch_on_start: bool = False
+    dedup_exact: bool = True  # pixel-identical captures hardlink the earlier files instead of re-encoding/OCR
+    dedup_similarity_bits: int = 0  # max perceptual-hash distance (of 64 bits) for near-duplicates; 0 = off
+    dedup_near_action: str = "link_text"  # "link_text" (new image, earlier text) | "skip" (save nothing)
+    dedup_history: int = 256  # recent captures remembered as link targets
+    write_durability: str = "batched"  # "strict" (wait for fsync) | "batched" (group commit in background) | "none"
+    retention_archive_after_days: int = 0  # compact older captures into per-day zip bundles; 0 = never
+    retention_max_total_mb: int = 0  # evict the oldest captures/bundles past this total size; 0 = no cap
+    retention_interval_minutes: int = 60
+    capture_mode: str = "full"  # "full" | "region" | "monitor_under_cursor" | "monitor:<n>" | "fancyzones" | "macsyzones"
+    # One rectangle, or a list of named rectangles grabbed together and OCRed separately
+    region: Union[Dict[str, int], List[Dict[str, Any]]] = field(
+        default_factory=lambda: {"left": 100, "top": 100, "width": 1280, "height": 720}
+    )
     fancyzones_prefer_under_cursor: bool = True
     fancyzones_zone_index: int = 0
     macsyzones_prefer_under_cursor: bool = True
@@ -54,12 +95,46 @@ class Config:
             "overwrite_mode": self.overwrite_mode,
             "hotkey": self.hotkey,
             "image_format": self.image_format,
+            "png_compress_level": self.png_compress_level,
+            "png_encoder": self.png_encoder,
             "ocr_lang": self.ocr_lang,
             "notify_on_success": self.notify_on_success,
             "debounce_ms": self.debounce_ms,
             "log_level": self.log_level,
             "tesseract_cmd": self.tesseract_cmd,
+            "ocr_backend": self.ocr_backend,
+            "ocr_parallel": self.ocr_parallel,
+            "ocr_workers": self.ocr_workers,
+            "ocr_warmup": self.ocr_warmup,
+            "ocr_cache": self.ocr_cache,
+            "ocr_cache_max_mb": self.ocr_cache_max_mb,
+            "search_index": self.search_index,
+            "incremental_ocr": self.incremental_ocr,
+            "text_detect": self.text_detect,
+            "preprocess": self.preprocess,
+            "ocr_profile": self.ocr_profile,
+            "ocr_profiles_by_mode": self.ocr_profiles_by_mode,
+            "ocr_profiles": self.ocr_profiles,
+            "calibration_budget_ms": self.calibration_budget_ms,
+            "calibration_samples": self.calibration_samples,
+            "ocr_outputs": self.ocr_outputs,
             "filename_pattern": self.filename_pattern,
+            "frame_queue_max_mb": self.frame_queue_max_mb,
+            "frame_queue_max_frames": self.frame_queue_max_frames,
+            "pipeline_queue_size": self.pipeline_queue_size,
+            "pipeline_workers": self.pipeline_workers,
+            "watch_interval_ms": self.watch_interval_ms,
+            "watch_threshold": self.watch_threshold,
+            "watch_cpu_budget": self.watch_cpu_budget,
+            "watch_on_start": self.watch_on_start,
+            "dedup_exact": self.dedup_exact,
+            "dedup_similarity_bits": self.dedup_similarity_bits,
+            "dedup_near_action": self.dedup_near_action,
+            "dedup_history": self.dedup_history,
+            "write_durability": self.write_durability,
+            "retention_archive_after_days": self.retention_archive_after_days,
+            "retention_max_total_mb": self.retention_max_total_mb,
+            "retention_interval_minutes": self.retention_interval_minutes,
             "capture_mode": self.capture_mode,
             "region": self.region,
             "fancyzones_prefer_under_cursor": self.fancyzones_prefer_under_cursor,
@@ -77,13 +152,47 @@ DEFAULTS = {
     "overwrite_mode": False,
     "hotkey": "<ctrl>+<shift>+s",
     "image_format": "PNG",
+    "png_compress_level": 6,
+    "png_encoder": "auto",
     "ocr_lang": "eng",
     "notify_on_success": False,
     "debounce_ms": 500,
     "log_level": "INFO",
     "tesseract_cmd": None,
+    "ocr_backend": "auto",
+    "ocr_parallel": False,
+    "ocr_workers": 0,
+    "ocr_warmup": True,
+    "ocr_cache": True,
+    "ocr_cache_max_mb": 64,
+    "search_index": True,
+    "incremental_ocr": False,
+    "text_detect": False,
+    "preprocess": DEFAULT_PREPROCESS,
+    "ocr_profile": "balanced",
+    "ocr_profiles_by_mode": {},
+    "ocr_profiles": {},
+    "calibration_budget_ms": 1500,
+    "calibration_samples": 12,
+    "ocr_outputs": ["txt"],
     # New defaults
     "filename_pattern": "{base}_{timestamp}",
+    "frame_queue_max_mb": 256,
+    "frame_queue_max_frames": 32,
+    "pipeline_queue_size": 4,
+    "pipeline_workers": {},
+    "watch_interval_ms": 1000,
+    "watch_threshold": 0.0003,
+    "watch_cpu_budget": 0.25,
+    "watch_on_start": False,
+    "dedup_exact": True,
+    "dedup_similarity_bits": 0,
+    "dedup_near_action": "link_text",
+    "dedup_history": 256,
+    "write_durability": "batched",
+    "retention_archive_after_days": 0,
+    "retention_max_total_mb": 0,
+    "retention_interval_minutes": 60,
     "capture_mode": "full",
     "region": {"left": 100, "top": 100, "width": 1280, "height": 720},
     "fancyzones_prefer_under_cursor": True,
@@ -109,6 +218,22 @@ def _merge_defaults(data: Dict[str, Any]) -> Dict[str, Any]:
     return merged
 
 
+def is_capture_mode(mode: Any) -> bool:
+    if mode in ("full", "region", "monitor_under_cursor", "fancyzones", "macsyzones"):
+        return True
+    return isinstance(mode, str) and re.fullmatch(r"monitor:\d+", mode) is not None
+
+
+def named_regions(region: Any) -> List[Dict[str, Any]]:
+    """`region` as a list of {name, left, top, width, height}; a single rectangle is named "region"."""
+    items = region if isinstance(region, list) else [region]
+    out: List[Dict[str, Any]] = []
+    for idx, item in enumerate(items):
+        name = item.get("name") or ("region" if len(items) == 1 else f"region{idx + 1}")
+        out.append({"name": str(name), **{k: int(item[k]) for k in ("left", "top", "width", "height")}})
+    return out
+
+
 def _validate(cfg: Dict[str, Any]) -> None:
     if not cfg["save_dir_images"] or not cfg["save_dir_text"]:
         raise ConfigValidationError("Output directories cannot be empty.")
@@ -116,9 +241,42 @@ def _validate(cfg: Dict[str, Any]) -> None:
         raise ConfigValidationError("base_filename cannot be empty.")
     if not isinstance(cfg["debounce_ms"], int) or cfg["debounce_ms"] < 0:
         raise ConfigValidationError("debounce_ms must be a non-negative integer.")
-    if cfg["image_format"].upper() != "PNG":
-        # We only officially support PNG for now; keep this strict and clear.
-        raise ConfigValidationError("image_format must be 'PNG'.")
+    if str(cfg["image_format"]).upper() not in ("PNG", "WEBP", "TIFF", "BMP"):
+        # Lossless formats only; OCR re-runs and dedup depend on exact pixels
+        raise ConfigValidationError("image_format must be one of: PNG | WEBP | TIFF | BMP.")
+    if not isinstance(cfg.get("png_compress_level"), int) or not 0 <= cfg["png_compress_level"] <= 9:
+        raise ConfigValidationError("png_compress_level must be an integer from 0 (fastest) to 9 (smallest).")
+    if str(cfg.get("png_encoder", "")).lower() not in ("auto", "pillow", "parallel"):
+        raise ConfigValidationError("png_encoder must be one of: auto | pillow | parallel.")
+    if str(cfg.get("ocr_backend", "")).lower() not in ("auto", "tesserocr", "pytesseract"):
+        raise ConfigValidationError("ocr_backend must be one of: auto | tesserocr | pytesseract.")
+    if not isinstance(cfg.get("ocr_workers"), int) or cfg["ocr_workers"] < 0:
+        raise ConfigValidationError("ocr_workers must be a non-negative integer (0 = one per CPU core).")
+    if not isinstance(cfg.get("ocr_cache_max_mb"), int) or cfg["ocr_cache_max_mb"] <= 0:
+        raise ConfigValidationError("ocr_cache_max_mb must be a positive integer.")
+    try:
+        Pipeline.from_config(cfg.get("preprocess"))
+    except (TypeError, ValueError) as exc:
+        raise ConfigValidationError(f"Invalid preprocess pipeline: {exc}") from exc
+    try:
+        profiles = load_profiles(cfg.get("ocr_profiles") or {})
+    except (TypeError, ValueError) as exc:
+        raise ConfigValidationError(f"Invalid ocr_profiles: {exc}") from exc
+    choices = set(profiles) | {"auto"}
+    by_mode = cfg.get("ocr_profiles_by_mode") or {}
+    if not isinstance(by_mode, dict):
+        raise ConfigValidationError("ocr_profiles_by_mode must map capture modes to profile names.")
+    for name in [cfg.get("ocr_profile"), *by_mode.values()]:
+        if name not in choices:
+            raise ConfigValidationError(
+                f"Unknown OCR profile '{name}'. Use one of: {' | '.join(sorted(choices))}."
+            )
+    for key in ("calibration_budget_ms", "calibration_samples"):
+        if not isinstance(cfg.get(key), int) or cfg[key] <= 0:
+            raise ConfigValidationError(f"{key} must be a positive integer.")
+    outputs = cfg.get("ocr_outputs")
+    if not isinstance(outputs, list) or not all(o in ("txt", "tsv", "hocr", "alto", "pdf") for o in outputs):
+        raise ConfigValidationError("ocr_outputs must be a list drawn from: txt | tsv | hocr | alto | pdf.")
     pattern = cfg.get("filename_pattern")
     if not isinstance(pattern, str) or not pattern.strip():
         raise ConfigValidationError("filename_pattern must be a non-empty string (e.g. \"{base}_{timestamp}\").")
@@ -128,12 +286,57 @@ def _validate(cfg: Dict[str, Any]) -> None:
         allowed = ", ".join(sorted(f"{{{name}}}" for name in _ALLOWED_FILENAME_FIELDS))
         bad = ", ".join(sorted(f"{{{name}}}" for name in invalid_fields))
         raise ConfigValidationError(f"filename_pattern may only use {allowed}. Remove: {bad}.")
-    if cfg.get("capture_mode") not in ("full", "region", "fancyzones", "macsyzones"):
-        raise ConfigValidationError("capture_mode must be one of: full | region | fancyzones | macsyzones.")
+    layout_error = validate_pattern(pattern)
+    if layout_error:
+        raise ConfigValidationError(layout_error)
+    for key in ("frame_queue_max_mb", "frame_queue_max_frames", "pipeline_queue_size"):
+        if not isinstance(cfg.get(key), int) or cfg[key] <= 0:
+            raise ConfigValidationError(f"{key} must be a positive integer.")
+    workers = cfg.get("pipeline_workers")
+    if not isinstance(workers, dict) or any(
+        stage not in ("capture", "encode", "ocr") or not isinstance(n, int) or n <= 0 for stage, n in workers.items()
+    ):
+        raise ConfigValidationError("pipeline_workers must map capture | encode | ocr to positive worker counts.")
+    if not isinstance(cfg.get("watch_interval_ms"), int) or cfg["watch_interval_ms"] < 50:
+        raise ConfigValidationError("watch_interval_ms must be an integer >= 50.")
+    if not isinstance(cfg.get("watch_threshold"), (int, float)) or not 0 <= cfg["watch_threshold"] < 1:
+        raise ConfigValidationError("watch_threshold must be a fraction between 0 and 1.")
+    if not isinstance(cfg.get("watch_cpu_budget"), (int, float)) or not 0 < cfg["watch_cpu_budget"] <= 1:
+        raise ConfigValidationError("watch_cpu_budget must be a fraction in (0, 1].")
+    if not isinstance(cfg.get("dedup_similarity_bits"), int) or not 0 <= cfg["dedup_similarity_bits"] <= 64:
+        raise ConfigValidationError("dedup_similarity_bits must be an integer from 0 (off) to 64.")
+    if cfg.get("dedup_near_action") not in ("link_text", "skip"):
+        raise ConfigValidationError("dedup_near_action must be one of: link_text | skip.")
+    if not isinstance(cfg.get("dedup_history"), int) or cfg["dedup_history"] <= 0:
+        raise ConfigValidationError("dedup_history must be a positive integer.")
+    if str(cfg.get("write_durability", "")).lower() not in ("strict", "batched", "none"):
+        raise ConfigValidationError("write_durability must be one of: strict | batched | none.")
+    for key in ("retention_archive_after_days", "retention_max_total_mb"):
+        if not isinstance(cfg.get(key), int) or isinstance(cfg.get(key), bool) or cfg[key] < 0:
+            raise ConfigValidationError(f"{key} must be a non-negative integer (0 = off).")
+    if not isinstance(cfg.get("retention_interval_minutes"), int) or cfg["retention_interval_minutes"] <= 0:
+        raise ConfigValidationError("retention_interval_minutes must be a positive integer.")
+    if not is_capture_mode(cfg.get("capture_mode")):
+        raise ConfigValidationError(
+            "capture_mode must be one of: full | region | monitor_under_cursor | monitor:<n> | fancyzones | macsyzones."
+        )
     reg = cfg.get("region") or {}
-    for k in ("left", "top", "width", "height"):
-        if k not in reg:
-            raise ConfigValidationError("region must include left/top/width/height")
+    items = reg if isinstance(reg, list) else [reg]
+    if not items:
+        raise ConfigValidationError("region must be a rectangle or a non-empty list of named rectangles.")
+    for item in items:
+        if not isinstance(item, dict):
+            raise ConfigValidationError("region list entries must be mappings with name/left/top/width/height.")
+        for k in ("left", "top", "width", "height"):
+            if k not in item:
+                raise ConfigValidationError("region must include left/top/width/height")
+            if not isinstance(item[k], int):
+                raise ConfigValidationError(f"region {k} must be an integer.")
+        if item["width"] <= 0 or item["height"] <= 0:
+            raise ConfigValidationError("region width and height must be positive.")
+    names = [r["name"] for r in named_regions(reg)]
+    if len(set(names)) != len(names):
+        raise ConfigValidationError("region names must be unique.")
 
 
 def load_or_create_config() -> Config:
@@ -182,7 +385,7 @@ overwrite_mode: false
 # Hotkey (pynput syntax)
 hotkey: "<ctrl>+<shift>+s"
 # Format and OCR
-image_format: PNG
+image_format: PNG  # PNG | WEBP (lossless) | TIFF | BMP (uncompressed)
 ocr_lang: "eng"
 # Behavior
 notify_on_success: true
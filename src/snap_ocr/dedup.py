@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from PIL import Image
+
+
+logger = logging.getLogger(__name__)
+
+_HASH_SIDE = 8  # dHash compares 9x8 grayscale neighbours -> 64 bits
+
+
+def pixel_digest(img: Image.Image) -> str:
+    """Exact content key: identical pixels, mode and size hash the same."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{img.mode}|{img.size}|".encode("utf-8"))
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def dhash(img: Image.Image) -> int:
+    """64-bit difference hash; robust to re-encoding, small shifts in anti-aliasing and scaling."""
+    small = img.convert("L").resize((_HASH_SIDE + 1, _HASH_SIDE), Image.Resampling.BOX)
+    px = small.tobytes()
+    bits = 0
+    for row in range(_HASH_SIDE):
+        base = row * (_HASH_SIDE + 1)
+        for col in range(_HASH_SIDE):
+            bits = (bits << 1) | (px[base + col] > px[base + col + 1])
+    return bits
+
+
+def files_size(paths: List[str]) -> int:
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+@dataclass
+class SavedCapture:
+    """A capture that was (or is being) saved, as a link target for later duplicates."""
+
+    digest: str
+    phash: int
+    size: Tuple[int, int]
+    key: str  # output settings (lang, profile, formats); matches only within the same key
+    img_path: str
+    txt_path: str
+    extra_paths: List[str] = field(default_factory=list)
+
+    def files(self) -> List[str]:
+        return [self.img_path, self.txt_path, *self.extra_paths]
+
+    def on_disk(self, text_only: bool = False, exists: Callable[[str], bool] = os.path.isfile) -> bool:
+        paths = [self.txt_path] if text_only else self.files()
+        return all(exists(p) for p in paths)
+
+
+class DedupIndex:
+    """
+    The most recent captures keyed by exact pixel digest and by perceptual hash. Lookups
+    only return entries whose files are still on disk, so overwrite mode or manual deletes
+    never produce dangling links.
+    """
+
+    def __init__(self, history: int) -> None:
+        self.history = history
+        self._entries: "OrderedDict[str, SavedCapture]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.ocr_calls_saved = 0
+        self.bytes_saved = 0
+
+    def find_exact(self, digest: str, key: str) -> Optional[SavedCapture]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry.key != key:
+                return None
+            self._entries.move_to_end(digest)
+        return entry
+
+    def find_similar(self, phash: int, size: Tuple[int, int], key: str, max_distance: int) -> Optional[Tuple[SavedCapture, int]]:
+        best: Optional[Tuple[SavedCapture, int]] = None
+        with self._lock:
+            for entry in reversed(self._entries.values()):
+                if entry.key != key or entry.size != size:
+                    continue
+                distance = (entry.phash ^ phash).bit_count()
+                if distance <= max_distance and (best is None or distance < best[1]):
+                    best = (entry, distance)
+                    if distance == 0:
+                        break
+        return best
+
+    def add(self, entry: SavedCapture) -> None:
+        with self._lock:
+            self._entries[entry.digest] = entry
+            self._entries.move_to_end(entry.digest)
+            while len(self._entries) > self.history:
+                self._entries.popitem(last=False)
+
+    def forget(self, digest: str) -> None:
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def reset(self, history: int) -> None:
+        """Drop remembered captures (e.g. after the OCR settings changed); counters are kept."""
+        with self._lock:
+            self.history = history
+            self._entries.clear()
+
+    def record_saved(self, kind: str, nbytes: int, ocr_skipped: bool) -> None:
+        with self._lock:
+            if kind == "exact":
+                self.exact_hits += 1
+            else:
+                self.near_hits += 1
+            self.bytes_saved += nbytes
+            if ocr_skipped:
+                self.ocr_calls_saved += 1
+
+    def summary(self) -> str:
+        return (
+            f"{self.exact_hits} exact and {self.near_hits} near duplicates, "
+            f"{self.ocr_calls_saved} OCR calls and {self.bytes_saved / (1024 * 1024):.1f} MB saved"
+        )
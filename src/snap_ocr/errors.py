@@ -25,3 +25,6 @@ class SnapOcrError(Exception):
     def __str__(self) -> str:
         return self.message
 
+    def __reduce__(self):  # keep fields when crossing process boundaries (OCR worker pool)
+        return (self.__class__, (self.code, self.message, self.cause))
+
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+import mmap
+import tempfile
+import threading
+from typing import Any, Optional, Tuple
+
+from PIL import Image
+
+
+logger = logging.getLogger(__name__)
+
+
+class HeldFrame:
+    """A captured frame waiting in the queue, either in memory or spilled to a mapped temp file."""
+
+    def __init__(self, spool: "FrameSpool", image: Image.Image, nbytes: int) -> None:
+        self._spool = spool
+        self._image: Optional[Image.Image] = image
+        self._mapped: Optional[Tuple[mmap.mmap, Any]] = None
+        self._geometry = (image.mode, image.size)
+        self.nbytes = nbytes
+
+    @property
+    def spilled(self) -> bool:
+        return self._mapped is not None
+
+    def _spill(self, image: Image.Image) -> None:
+        tmp = tempfile.TemporaryFile(prefix="snap-ocr-frame-")
+        tmp.truncate(self.nbytes)
+        mm = mmap.mmap(tmp.fileno(), self.nbytes)
+        mm[:] = image.tobytes()
+        self._mapped = (mm, tmp)
+        self._image = None
+
+    def discard(self) -> None:
+        """Drop a frame that will never be processed (e.g. its job was rejected)."""
+        try:
+            self.load()
+        except ValueError:
+            pass
+
+    def load(self) -> Image.Image:
+        """Take the frame out of the queue; frees its memory budget or temp file."""
+        if self._mapped is not None:
+            mm, tmp = self._mapped
+            self._mapped = None
+            mode, size = self._geometry
+            try:
+                image = Image.frombytes(mode, size, mm)
+            finally:
+                mm.close()
+                tmp.close()
+            return image
+        image = self._image
+        if image is None:
+            raise ValueError("frame already loaded")
+        self._image = None
+        self._spool._release(self.nbytes)
+        return image
+
+
+class FrameSpool:
+    """
+    Memory budget for frames grabbed at trigger time but not yet processed. Frames past
+    the budget are written to anonymous temp files and memory-mapped, so a burst of
+    captures behind a slow OCR stage cannot exhaust RAM.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._in_memory = 0
+        self._lock = threading.Lock()
+
+    def hold(self, image: Image.Image) -> HeldFrame:
+        nbytes = image.width * image.height * len(image.getbands())
+        with self._lock:
+            fits = self._in_memory + nbytes <= self.max_bytes
+            if fits:
+                self._in_memory += nbytes
+        frame = HeldFrame(self, image, nbytes)
+        if not fits:
+            frame._spill(image)
+            logger.debug(
+                "Frame queue over budget (%d of %d MB in memory); spilled %s×%s frame to disk",
+                self._in_memory // (1024 * 1024),
+                self.max_bytes // (1024 * 1024),
+                image.width,
+                image.height,
+            )
+        return frame
+
+    def _release(self, nbytes: int) -> None:
+        with self._lock:
+            self._in_memory -= nbytes
+
+    @property
+    def in_memory(self) -> int:
+        return self._in_memory
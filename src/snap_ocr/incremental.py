@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from PIL import Image, ImageChops, ImageFilter
+
+from .ocr import OcrLine, _normalize_choices
+
+
+logger = logging.getLogger(__name__)
+
+Band = Tuple[int, int]  # (top, bottom) rows, bottom exclusive
+
+_INK_THRESHOLD = 2  # mean edge strength per row that counts as "has content"
+_MIN_GAP = 4  # blank rows needed to split two bands
+_BAND_PAD = 2
+_COMPOSITE_GAP = 12
+
+
+def text_bands(img: Image.Image) -> List[Band]:
+    """
+    Split a frame into full-width horizontal bands of content separated by blank rows.
+    Rows are scored by their mean edge strength, computed in C by shrinking an edge map
+    to one column.
+    """
+    gray = img.convert("L")
+    if gray.width < 3 or gray.height < 3:
+        return [(0, gray.height)] if gray.height else []
+    # The edge filter flags the 1px image border; drop it before profiling
+    edges = gray.filter(ImageFilter.FIND_EDGES).crop((1, 1, gray.width - 1, gray.height - 1))
+    profile = list(edges.resize((1, edges.height), Image.BOX).getdata())
+    bands: List[Band] = []
+    start: Optional[int] = None
+    last_ink = -_MIN_GAP
+    for y, value in enumerate(profile, start=1):
+        if value < _INK_THRESHOLD:
+            continue
+        if start is None:
+            start = y
+        elif y - last_ink > _MIN_GAP:
+            bands.append((start, last_ink + 1))
+            start = y
+        last_ink = y
+    if start is not None:
+        bands.append((start, last_ink + 1))
+    return [(max(0, top - _BAND_PAD), min(gray.height, bottom + _BAND_PAD)) for top, bottom in bands]
+
+
+def _band_hash(img: Image.Image, band: Band) -> str:
+    return hashlib.blake2b(img.crop((0, band[0], img.width, band[1])).tobytes(), digest_size=16).hexdigest()
+
+
+def _assign_lines(lines: List[OcrLine], bands: List[Tuple[int, Band]]) -> Dict[int, List[OcrLine]]:
+    """Map each OCR line to the band (by index) containing its vertical centre, or the nearest one."""
+    out: Dict[int, List[OcrLine]] = {idx: [] for idx, _ in bands}
+    if not bands:
+        return out
+    for line in lines:
+        centre = (line.top + line.bottom) / 2
+        best = min(bands, key=lambda b: 0 if b[1][0] <= centre < b[1][1] else min(abs(centre - b[1][0]), abs(centre - b[1][1])))
+        out[best[0]].append(line)
+    return out
+
+
+def _lines_text(lines: List[OcrLine]) -> str:
+    return "\n".join(ln.text for ln in sorted(lines, key=lambda ln: (ln.top, ln.left)))
+
+
+class IncrementalOcr:
+    """
+    Remembers the previous frame of a capture target and the OCR text of each content band.
+    On the next capture only bands whose pixels changed are recognised (stacked into one
+    composite image so it stays a single engine call); the rest reuse their stored text.
+    """
+
+    def __init__(self, full_ratio: float = 0.6) -> None:
+        self.full_ratio = full_ratio
+        self._key: Optional[Hashable] = None
+        self._prev: Optional[Image.Image] = None
+        self._prev_text = ""
+        self._band_text: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        self._key = None
+        self._prev = None
+        self._prev_text = ""
+        self._band_text = {}
+
+    def run(self, img: Image.Image, key: Hashable, ocr_lines: Callable[[Image.Image], List[OcrLine]]) -> str:
+        with self._lock:
+            return self._run_locked(img, key, ocr_lines)
+
+    def _run_locked(self, img: Image.Image, key: Hashable, ocr_lines: Callable[[Image.Image], List[OcrLine]]) -> str:
+        frame = img.convert("RGB")
+        if key != self._key or self._prev is None or self._prev.size != frame.size:
+            self.reset()
+            self._key = key
+        elif ImageChops.difference(self._prev, frame).getbbox() is None:
+            logger.debug("Incremental OCR: frame unchanged, reusing previous text")
+            return self._prev_text
+
+        bands = text_bands(frame)
+        hashes = [_band_hash(frame, band) for band in bands]
+        dirty = [(idx, band) for idx, (band, h) in enumerate(zip(bands, hashes)) if h not in self._band_text]
+        texts: Dict[int, str] = {idx: self._band_text[h] for idx, h in enumerate(hashes) if h in self._band_text}
+
+        dirty_rows = sum(b[1] - b[0] for _, b in dirty)
+        total_rows = sum(b[1] - b[0] for b in bands) or 1
+        if dirty and (not texts or dirty_rows / total_rows > self.full_ratio):
+            # Mostly new content: one pass over the whole frame, then split by band
+            assigned = _assign_lines(ocr_lines(frame), list(enumerate(bands)))
+            texts = {idx: _lines_text(lines) for idx, lines in assigned.items()}
+        elif dirty:
+            texts.update(self._ocr_dirty(frame, dirty, ocr_lines))
+        logger.debug(
+            "Incremental OCR: %d/%d bands changed (%.0f%% of content rows)",
+            len(dirty),
+            len(bands),
+            100.0 * dirty_rows / total_rows,
+        )
+
+        self._band_text = {h: texts.get(idx, "") for idx, h in enumerate(hashes)}
+        parts = [texts.get(idx, "") for idx in range(len(bands))]
+        text = _normalize_choices("\n".join(p for p in parts if p) + "\n") if any(parts) else ""
+        self._prev = frame
+        self._prev_text = text
+        return text
+
+    def _ocr_dirty(
+        self,
+        frame: Image.Image,
+        dirty: List[Tuple[int, Band]],
+        ocr_lines: Callable[[Image.Image], List[OcrLine]],
+    ) -> Dict[int, str]:
+        """Stack dirty bands into one composite, OCR it once, and map lines back to bands."""
+        height = sum(b[1] - b[0] for _, b in dirty) + _COMPOSITE_GAP * (len(dirty) + 1)
+        background = frame.getpixel((0, 0))
+        composite = Image.new("RGB", (frame.width, height), background)
+        placed: List[Tuple[int, Band]] = []
+        y = _COMPOSITE_GAP
+        for idx, band in dirty:
+            composite.paste(frame.crop((0, band[0], frame.width, band[1])), (0, y))
+            placed.append((idx, (y, y + band[1] - band[0])))
+            y += band[1] - band[0] + _COMPOSITE_GAP
+        assigned = _assign_lines(ocr_lines(composite), placed)
+        return {idx: _lines_text(lines) for idx, lines in assigned.items()}
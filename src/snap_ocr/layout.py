@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from string import Formatter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .paths import ensure_dir
+from .util import build_timestamped_name
+
+
+logger = logging.getLogger(__name__)
+
+# {base} and {timestamp} name the file; the date fields are meant for shard directories,
+# e.g. "{year}/{month}/{day}/{base}_{timestamp}". "/" separates directories on every OS.
+FILENAME_FIELDS = {"base", "timestamp", "year", "month", "day", "hour"}
+
+_FIELD_RES = {"timestamp": r"\d{8}_\d{6}", "year": r"\d{4}", "month": r"\d{2}", "day": r"\d{2}", "hour": r"\d{2}"}
+
+
+def pattern_context(base: str, when: time.struct_time) -> Dict[str, str]:
+    return {
+        "base": base,
+        "timestamp": build_timestamped_name(when),
+        "year": time.strftime("%Y", when),
+        "month": time.strftime("%m", when),
+        "day": time.strftime("%d", when),
+        "hour": time.strftime("%H", when),
+    }
+
+
+def format_stem(pattern: str, base: str, when: time.struct_time) -> str:
+    """Relative output stem (shard directories + file name, no extension) for a capture at `when`."""
+    stem = pattern.format(**pattern_context(base, when))
+    return os.path.join(*[part.strip() for part in stem.split("/")])
+
+
+def validate_pattern(pattern: str) -> Optional[str]:
+    """Error message for a pattern that would write outside the output folders, else None."""
+    parts = pattern.split("/")
+    if pattern.startswith(("/", "\\")) or re.match(r"^[A-Za-z]:", pattern):
+        return "filename_pattern must be relative to the output folders."
+    if any(not part.strip() or part.strip() in (".", "..") for part in parts):
+        return "filename_pattern directories cannot be empty, '.' or '..'."
+    if "\\" in pattern:
+        return "filename_pattern separates directories with '/'."
+    return None
+
+
+def shard_dir(pattern: str, base: str, when: time.struct_time) -> str:
+    """Directory part of the pattern for a capture at `when`; '' for a flat layout."""
+    if "/" not in pattern:
+        return ""
+    return os.path.dirname(format_stem(pattern, base, when))
+
+
+class CaptureNames:
+    """
+    Recognises file stems this app wrote: the file-name part of `pattern` (and of the default
+    pattern, for captures saved before it changed) with `base` filled in. parse() returns the
+    capture time encoded in the name, or None for any other file.
+    """
+
+    def __init__(self, pattern: str, base: str) -> None:
+        patterns = dict.fromkeys([pattern.split("/")[-1].strip(), "{base}_{timestamp}"])
+        self._regexes = [_name_regex(name, base) for name in patterns]
+
+    def parse(self, stem: str) -> Optional[time.struct_time]:
+        for regex in self._regexes:
+            match = regex.match(stem)
+            if match is None:
+                continue
+            fields = match.groupdict()
+            try:
+                if fields.get("timestamp"):
+                    return time.strptime(fields["timestamp"], "%Y%m%d_%H%M%S")
+                if fields.get("year") and fields.get("month") and fields.get("day"):
+                    hour = fields.get("hour") or "00"
+                    return time.strptime(f"{fields['year']}{fields['month']}{fields['day']}{hour}", "%Y%m%d%H")
+            except ValueError:
+                continue
+        return None
+
+
+def _name_regex(name_pattern: str, base: str) -> "re.Pattern[str]":
+    parts = ["^"]
+    seen = set()
+    for literal, field_name, _spec, _conv in Formatter().parse(name_pattern):
+        parts.append(re.escape(literal))
+        if field_name is None:
+            continue
+        if field_name == "base":
+            parts.append(re.escape(base))
+        elif field_name in seen:
+            parts.append(f"(?P={field_name})")
+        else:
+            seen.add(field_name)
+            parts.append(f"(?P<{field_name}>{_FIELD_RES[field_name]})")
+    return re.compile("".join(parts) + "$")
+
+
+@dataclass
+class MigrateStats:
+    moved: int = 0
+    conflicts: int = 0  # a different file already at the destination; left in place
+    skipped: int = 0  # not named like a capture; left in place
+    failed: int = 0
+    started: float = field(default_factory=time.monotonic)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def summary(self) -> str:
+        elapsed = max(1e-9, time.monotonic() - self.started)
+        return (
+            f"{self.moved} moved, {self.conflicts} conflicts, {self.skipped} skipped, {self.failed} failed "
+            f"in {elapsed:.1f}s ({self.moved / elapsed:.0f} files/s)"
+        )
+
+
+def migrate_layout(
+    roots: List[str],
+    pattern: str,
+    base: str,
+    workers: int = 0,
+    progress: Optional[Callable[[MigrateStats], None]] = None,
+    on_moved: Optional[Callable[[List[Tuple[str, str]]], None]] = None,
+) -> MigrateStats:
+    """
+    Move captures lying directly in each root into the shard directories `pattern` gives
+    them, keeping file names. Only files whose stem CaptureNames recognises are moved, dated
+    by the time in their name; anything else is counted as skipped and left alone. Each move is a single rename and only files still at the top level
+    are considered, so an interrupted run resumes by running it again. `on_moved` receives
+    (old, new) path pairs in batches, e.g. to update the search index.
+    """
+    stats = MigrateStats()
+    names = CaptureNames(pattern, base)
+    made: set = set()
+    made_lock = threading.Lock()
+
+    def move(src: str) -> Optional[Tuple[str, str]]:
+        try:
+            name = os.path.basename(src)
+            when = names.parse(os.path.splitext(name)[0])
+            if when is None:
+                with stats._lock:
+                    stats.skipped += 1
+                logger.debug("Not moving %s: not named like a capture", src)
+                return None
+            rel = shard_dir(pattern, base, when)
+            if not rel:
+                return None
+            dest_dir = os.path.join(os.path.dirname(src), rel)
+            with made_lock:
+                if dest_dir not in made:
+                    ensure_dir(dest_dir)
+                    made.add(dest_dir)
+            dest = os.path.join(dest_dir, name)
+            if os.path.exists(dest):
+                with stats._lock:
+                    stats.conflicts += 1
+                logger.warning("Not moving %s: %s already exists", src, dest)
+                return None
+            os.replace(src, dest)
+        except OSError as exc:
+            with stats._lock:
+                stats.failed += 1
+            logger.warning("Failed to move %s: %s", src, exc)
+            return None
+        with stats._lock:
+            stats.moved += 1
+        return src, dest
+
+    with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) * 4)) as pool:
+        for root in roots:
+            if not os.path.isdir(root):
+                continue
+            with os.scandir(root) as entries:
+                files = [e.path for e in entries if e.is_file() and not e.name.endswith(".tmp")]
+            for start in range(0, len(files), 1000):
+                done = [pair for pair in pool.map(move, files[start : start + 1000]) if pair]
+                if on_moved is not None and done:
+                    on_moved(done)
+                if progress is not None:
+                    progress(stats)
+    return stats
+
@@ -1,20 +1,326 @@
 from __future__ import annotations
 
+import logging
 import re
-from typing import Optional
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
-from PIL import Image, ImageEnhance
+from PIL import Image, ImageDraw
 import pytesseract
 from pytesseract import TesseractNotFoundError
 
 from .errors import ErrorCode, SnapOcrError
+from .preprocess import Pipeline
 
+if TYPE_CHECKING:
+    from .ocr_cache import OcrCache
 
-def _prepare_for_ocr(img: Image.Image) -> Image.Image:
-    """Convert to grayscale and boost contrast to help OCR."""
-    gray = img.convert("L")
-    enhancer = ImageEnhance.Contrast(gray)
-    return enhancer.enhance(1.8)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PSM = 6
+
+# Renderer name -> extension of the file it produces (Tesseract writes ALTO as .xml)
+OUTPUT_EXTENSIONS = {"txt": "txt", "tsv": "tsv", "hocr": "hocr", "alto": "xml", "pdf": "pdf"}
+
+_TSV_HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext\n"
+
+
+class OcrBackend:
+    """
+    Engine that turns a prepared image into text.
+    Backends are long-lived: App creates one at startup and reuses it for every capture.
+    """
+
+    name = "base"
+
+    def image_to_string(self, img: Image.Image, lang: str, psm: int = DEFAULT_PSM, oem: Optional[int] = None) -> str:
+        raise NotImplementedError
+
+    def image_to_tsv(self, img: Image.Image, lang: str, psm: int = DEFAULT_PSM, oem: Optional[int] = None) -> str:
+        """Word-level results in Tesseract's TSV layout (boxes + confidences)."""
+        raise NotImplementedError
+
+    def render(
+        self,
+        img: Image.Image,
+        lang: str,
+        formats: Sequence[str],
+        psm: int = DEFAULT_PSM,
+        oem: Optional[int] = None,
+    ) -> Dict[str, bytes]:
+        """Recognise once and return each requested renderer's output (see OUTPUT_EXTENSIONS)."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        return None
+
+
+class PytesseractBackend(OcrBackend):
+    """Runs the tesseract CLI once per call via pytesseract (the original behavior)."""
+
+    name = "pytesseract"
+
+    def __init__(self, tesseract_cmd: Optional[str] = None) -> None:
+        self.tesseract_cmd = tesseract_cmd
+
+    def _config(self, psm: int, oem: Optional[int]) -> str:
+        if self.tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = self.tesseract_cmd
+        return f"--psm {psm}" if oem is None else f"--oem {oem} --psm {psm}"
+
+    def image_to_string(self, img: Image.Image, lang: str, psm: int = DEFAULT_PSM, oem: Optional[int] = None) -> str:
+        return pytesseract.image_to_string(img, lang=lang, config=self._config(psm, oem))
+
+    def image_to_tsv(self, img: Image.Image, lang: str, psm: int = DEFAULT_PSM, oem: Optional[int] = None) -> str:
+        return pytesseract.image_to_data(img, lang=lang, config=self._config(psm, oem))
+
+    def render(
+        self,
+        img: Image.Image,
+        lang: str,
+        formats: Sequence[str],
+        psm: int = DEFAULT_PSM,
+        oem: Optional[int] = None,
+    ) -> Dict[str, bytes]:
+        # Tesseract accepts several renderer configs in one invocation and writes one file per renderer
+        config = " ".join([self._config(psm, oem), *formats])
+        outputs: Dict[str, bytes] = {}
+        with pytesseract.pytesseract.save(img) as (temp_name, input_filename):
+            pytesseract.pytesseract.run_tesseract(input_filename, temp_name, "", lang, config)
+            for fmt in formats:
+                with open(f"{temp_name}.{OUTPUT_EXTENSIONS[fmt]}", "rb") as f:
+                    outputs[fmt] = f.read()
+        return outputs
+
+
+class TesserocrBackend(OcrBackend):
+    """
+    Keeps initialised libtesseract engines in-process (per lang/PSM/OEM), so a capture
+    skips the temp file, process spawn and traineddata load. Requires the optional
+    `tesserocr` package. `tesseract_cmd` is only used for renderers that need the CLI.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, tesseract_cmd: Optional[str] = None) -> None:
+        import tesserocr  # optional dependency; ImportError means "not available"
+
+        self._tesserocr = tesserocr
+        self.tesseract_cmd = tesseract_cmd
+        # Idle engines per (lang, psm, oem). A PyTessBaseAPI is not re-entrant, so concurrent
+        # callers (e.g. named regions OCRed on threads) each check one out; tesseract releases
+        # the GIL while recognising, so they really run in parallel.
+        self._idle: Dict[Tuple[str, int, Optional[int]], List[Any]] = {}
+        self._closed = False
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def _engine(self, lang: str, psm: int, oem: Optional[int] = None) -> Iterator[Any]:
+        key = (lang, psm, oem)
+        with self._guard:
+            idle = self._idle.setdefault(key, [])
+            api = idle.pop() if idle else None
+        if api is None:
+            kwargs: Dict[str, Any] = {"lang": lang, "psm": psm}
+            if oem is not None:
+                kwargs["oem"] = oem
+            api = self._tesserocr.PyTessBaseAPI(**kwargs)
+            logger.debug("Initialised tesserocr engine lang=%s psm=%s oem=%s", lang, psm, oem)
+        try:
+            yield api
+        finally:
+            with self._guard:
+                closed = self._closed
+                if not closed:
+                    self._idle.setdefault(key, []).append(api)
+            if closed:  # close() ran while this engine was busy
+                _end_engine(api)
+
+    def image_to_string(self, img: Image.Image, lang: str, psm: int = DEFAULT_PSM, oem: Optional[int] = None) -> str:
+        with self._engine(lang, psm, oem) as api:
+            api.SetImage(img)
+            try:
+                return api.GetUTF8Text()
+            finally:
+                api.Clear()
+
+    def image_to_tsv(self, img: Image.Image, lang: str, psm: int = DEFAULT_PSM, oem: Optional[int] = None) -> str:
+        with self._engine(lang, psm, oem) as api:
+            api.SetImage(img)
+            try:
+                api.Recognize()
+                # tesserocr omits the header row pytesseract returns
+                return api.GetTSVText(0)
+            finally:
+                api.Clear()
+
+    def render(
+        self,
+        img: Image.Image,
+        lang: str,
+        formats: Sequence[str],
+        psm: int = DEFAULT_PSM,
+        oem: Optional[int] = None,
+    ) -> Dict[str, bytes]:
+        outputs: Dict[str, bytes] = {}
+        with self._engine(lang, psm, oem) as api:
+            api.SetImage(img)
+            try:
+                api.Recognize()
+                for fmt in formats:
+                    if fmt == "txt":
+                        outputs[fmt] = api.GetUTF8Text().encode("utf-8")
+                    elif fmt == "tsv":
+                        outputs[fmt] = (_TSV_HEADER + api.GetTSVText(0)).encode("utf-8")
+                    elif fmt == "hocr":
+                        outputs[fmt] = _wrap_hocr(api.GetHOCRText(0)).encode("utf-8")
+                    elif fmt == "alto" and hasattr(api, "GetAltoText"):
+                        outputs[fmt] = api.GetAltoText(0).encode("utf-8")
+            finally:
+                api.Clear()
+        # The PDF renderer (and ALTO on older tesserocr) is only reachable through the CLI
+        missing = [fmt for fmt in formats if fmt not in outputs]
+        if missing:
+            logger.debug("tesserocr cannot render %s in-process; using the tesseract CLI", ", ".join(missing))
+            outputs.update(PytesseractBackend(self.tesseract_cmd).render(img, lang, missing, psm, oem))
+        return outputs
+
+    def close(self) -> None:
+        """End idle engines now; busy ones end when their caller is done with them."""
+        with self._guard:
+            self._closed = True
+            engines = [api for idle in self._idle.values() for api in idle]
+            self._idle.clear()
+        for api in engines:
+            _end_engine(api)
+
+
+def _end_engine(api: Any) -> None:
+    try:
+        api.End()
+    except Exception:
+        pass
+
+
+def _wrap_hocr(body: str) -> str:
+    """GetHOCRText returns only the page div; add the document shell the CLI renderer writes."""
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN"\n'
+        '    "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">\n'
+        '<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">\n'
+        " <head>\n"
+        "  <title></title>\n"
+        '  <meta http-equiv="Content-Type" content="text/html;charset=utf-8"/>\n'
+        "  <meta name='ocr-system' content='tesseract'/>\n"
+        "  <meta name='ocr-capabilities' content='ocr_page ocr_carea ocr_par ocr_line ocrx_word ocrp_wconf'/>\n"
+        " </head>\n"
+        " <body>\n"
+        f"{body}"
+        " </body>\n"
+        "</html>\n"
+    )
+
+
+def create_ocr_backend(name: str = "auto", tesseract_cmd: Optional[str] = None) -> OcrBackend:
+    """
+    Build the configured backend. 'auto' prefers tesserocr when installed; any failure to
+    load the in-process engine falls back to pytesseract.
+    """
+    choice = (name or "auto").lower()
+    if choice in ("auto", "tesserocr"):
+        try:
+            return TesserocrBackend(tesseract_cmd)
+        except Exception as exc:
+            if choice == "tesserocr":
+                logger.warning("ocr_backend 'tesserocr' unavailable (%s); falling back to pytesseract", exc)
+            else:
+                logger.debug("tesserocr not available (%s); using pytesseract", exc)
+    return PytesseractBackend(tesseract_cmd)
+
+
+@dataclass
+class OcrLine:
+    """One recognised text line with its box in source-image pixels."""
+
+    left: int
+    top: int
+    right: int
+    bottom: int
+    text: str
+    paragraph: Tuple[Any, ...] = ()
+
+    @property
+    def height(self) -> int:
+        return self.bottom - self.top
+
+
+def parse_tsv_lines(
+    tsv: str,
+    offset: Tuple[int, int] = (0, 0),
+    tag: Any = None,
+    scale: float = 1.0,
+) -> List[OcrLine]:
+    """
+    Group Tesseract TSV word rows into lines. `scale` undoes any resampling done during
+    preprocessing, `offset` then shifts boxes into the coordinate space of a larger frame,
+    and `tag` keeps paragraph ids from different tiles apart.
+    """
+    dx, dy = offset
+    grouped: Dict[Tuple[int, int, int], List[Tuple[int, int, int, int, str]]] = {}
+    for row in tsv.splitlines():
+        cols = row.split("\t", 11)
+        if len(cols) < 12 or cols[0] != "5":
+            continue  # header row or a non-word level
+        text = cols[11].strip()
+        if not text:
+            continue
+        try:
+            key = (int(cols[2]), int(cols[3]), int(cols[4]))
+            left, top, width, height = (int(c) for c in cols[6:10])
+        except ValueError:
+            continue
+        grouped.setdefault(key, []).append((left, top, width, height, text))
+    lines: List[OcrLine] = []
+    for (block, par, _line), words in grouped.items():
+        words.sort(key=lambda w: w[0])
+        lines.append(
+            OcrLine(
+                left=int(min(w[0] for w in words) / scale) + dx,
+                top=int(min(w[1] for w in words) / scale) + dy,
+                right=int(max(w[0] + w[2] for w in words) / scale) + dx,
+                bottom=int(max(w[1] + w[3] for w in words) / scale) + dy,
+                text=" ".join(w[4] for w in words),
+                paragraph=(tag, block, par),
+            )
+        )
+    return lines
+
+
+@contextmanager
+def _ocr_errors(tesseract_cmd: Optional[str]) -> Iterator[None]:
+    """Translate engine exceptions into SnapOcrError with actionable messages."""
+    try:
+        yield
+    except SnapOcrError:
+        raise
+    except TesseractNotFoundError as e:
+        raise SnapOcrError(ErrorCode.MISSING_TESSERACT, build_tesseract_missing_message(tesseract_cmd), e)
+    except Exception as e:
+        raise SnapOcrError(ErrorCode.OCR_FAILED, build_ocr_failed_message(e), e)
+
+
+_DEFAULT_PIPELINE = Pipeline.from_config(None)
+
+
+def _prepare_for_ocr(img: Image.Image, pipeline: Optional[Pipeline] = None) -> Tuple[Image.Image, float]:
+    """Run the preprocessing pipeline (grayscale + contrast boost by default) to help OCR."""
+    result = (pipeline or _DEFAULT_PIPELINE).run(img)
+    return result.image, result.scale
 
 
 def _normalize_choices(text: str) -> str:
@@ -33,17 +339,136 @@ def _normalize_choices(text: str) -> str:
     return pattern.sub(repl, text)
 
 
-def perform_ocr(img: Image.Image, lang: str, tesseract_cmd: Optional[str] = None) -> str:
-    try:
-        if tesseract_cmd:
-            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
-        processed = _prepare_for_ocr(img)
-        text = pytesseract.image_to_string(processed, lang=lang, config="--psm 6")
-        return _normalize_choices(text)
-    except TesseractNotFoundError as e:
-        raise SnapOcrError(ErrorCode.MISSING_TESSERACT, build_tesseract_missing_message(tesseract_cmd), e)
-    except Exception as e:
-        raise SnapOcrError(ErrorCode.OCR_FAILED, build_ocr_failed_message(e), e)
+def perform_ocr(
+    img: Image.Image,
+    lang: str,
+    tesseract_cmd: Optional[str] = None,
+    backend: Optional[OcrBackend] = None,
+    cache: Optional["OcrCache"] = None,
+    pipeline: Optional[Pipeline] = None,
+    psm: int = DEFAULT_PSM,
+    oem: Optional[int] = None,
+) -> str:
+    engine = backend or PytesseractBackend(tesseract_cmd)
+    with _ocr_errors(tesseract_cmd):
+        processed, _scale = _prepare_for_ocr(img, pipeline)
+        key = None
+        if cache is not None:
+            key = cache.make_key(processed, lang, f"{engine.name}|psm={psm}|oem={oem}")
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        text = _normalize_choices(engine.image_to_string(processed, lang, psm, oem))
+    if cache is not None and key is not None:
+        cache.put(key, text)
+    return text
+
+
+def warm_up(
+    backend: OcrBackend,
+    lang: str,
+    tesseract_cmd: Optional[str] = None,
+    pipeline: Optional[Pipeline] = None,
+    psm: int = DEFAULT_PSM,
+    oem: Optional[int] = None,
+) -> float:
+    """
+    Run one tiny recognition so traineddata, shared libraries and (for tesserocr) the engine
+    are loaded before the first real capture. Returns the elapsed milliseconds.
+    """
+    sample = Image.new("RGB", (160, 40), "white")
+    ImageDraw.Draw(sample).text((8, 12), "Snap OCR 123", fill="black")
+    started = time.perf_counter()
+    perform_ocr(sample, lang, tesseract_cmd, backend=backend, pipeline=pipeline, psm=psm, oem=oem)
+    return (time.perf_counter() - started) * 1000.0
+
+
+def perform_ocr_outputs(
+    img: Image.Image,
+    lang: str,
+    formats: Sequence[str],
+    tesseract_cmd: Optional[str] = None,
+    backend: Optional[OcrBackend] = None,
+    cache: Optional["OcrCache"] = None,
+    pipeline: Optional[Pipeline] = None,
+    psm: int = DEFAULT_PSM,
+    oem: Optional[int] = None,
+) -> Tuple[str, Dict[str, bytes]]:
+    """
+    Like perform_ocr, but one engine pass also produces the extra renderer outputs in
+    `formats` (tsv, hocr, alto, pdf). tsv/hOCR/ALTO boxes are mapped back to `img`'s pixels
+    when preprocessing resampled it; the PDF embeds the preprocessed image its text layer
+    was laid over. Returns the text plus {format: bytes} for the extras.
+    """
+    extras = [fmt for fmt in dict.fromkeys(formats) if fmt != "txt"]
+    if not extras:
+        return perform_ocr(img, lang, tesseract_cmd, backend, cache, pipeline, psm, oem), {}
+    engine = backend or PytesseractBackend(tesseract_cmd)
+    with _ocr_errors(tesseract_cmd):
+        processed, scale = _prepare_for_ocr(img, pipeline)
+        rendered = engine.render(processed, lang, ["txt", *extras], psm, oem)
+    text = _normalize_choices(rendered.pop("txt").decode("utf-8"))
+    if abs(scale - 1.0) > 1e-6:
+        rendered = {fmt: _to_source_pixels(fmt, data, scale) for fmt, data in rendered.items()}
+    if cache is not None:
+        # The extras still need the engine next time, but the text is reusable by plain captures
+        cache.put(cache.make_key(processed, lang, f"{engine.name}|psm={psm}|oem={oem}"), text)
+    return text, rendered
+
+
+_HOCR_BOX_RE = re.compile(r"\b(bbox|x_size|x_descenders|x_ascenders|baseline)((?: -?[\d.]+)+)")
+_ALTO_POS_RE = re.compile(r'\b(HPOS|VPOS|WIDTH|HEIGHT)="(-?[\d.]+)"')
+
+
+def _to_source_pixels(fmt: str, data: bytes, scale: float) -> bytes:
+    """Divide renderer coordinates by the preprocessing scale so they match the saved image."""
+
+    def px(value: str) -> str:
+        return str(int(round(float(value) / scale)))
+
+    if fmt == "tsv":
+        lines = data.decode("utf-8").split("\n")
+        for i, line in enumerate(lines[1:], start=1):
+            cols = line.split("\t")
+            if len(cols) >= 10:
+                cols[6:10] = [px(v) for v in cols[6:10]]
+                lines[i] = "\t".join(cols)
+        return "\n".join(lines).encode("utf-8")
+    if fmt == "hocr":
+
+        def hocr(match: "re.Match[str]") -> str:
+            values = match.group(2).split()
+            if match.group(1) == "baseline":
+                values[1:] = [px(v) for v in values[1:]]  # slope is unitless; only the offset scales
+            elif match.group(1) == "bbox":
+                values = [px(v) for v in values]
+            else:
+                values = [f"{float(v) / scale:.2f}" for v in values]
+            return f"{match.group(1)} {' '.join(values)}"
+
+        return _HOCR_BOX_RE.sub(hocr, data.decode("utf-8")).encode("utf-8")
+    if fmt == "alto":
+        return _ALTO_POS_RE.sub(lambda m: f'{m.group(1)}="{px(m.group(2))}"', data.decode("utf-8")).encode("utf-8")
+    return data
+
+
+def perform_ocr_lines(
+    img: Image.Image,
+    lang: str,
+    tesseract_cmd: Optional[str] = None,
+    backend: Optional[OcrBackend] = None,
+    offset: Tuple[int, int] = (0, 0),
+    tag: Any = None,
+    pipeline: Optional[Pipeline] = None,
+    psm: int = DEFAULT_PSM,
+    oem: Optional[int] = None,
+) -> List[OcrLine]:
+    """Like perform_ocr, but keeps line boxes so partial results can be stitched together."""
+    engine = backend or PytesseractBackend(tesseract_cmd)
+    with _ocr_errors(tesseract_cmd):
+        processed, scale = _prepare_for_ocr(img, pipeline)
+        tsv = engine.image_to_tsv(processed, lang, psm, oem)
+    return parse_tsv_lines(tsv, offset, tag, scale)
 
 
 def build_tesseract_missing_message(tesseract_cmd: Optional[str]) -> str:
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from PIL import Image
+
+from .util import remove_sqlite_files
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = "ocr-cache.sqlite3"
+
+
+class OcrCache:
+    """
+    Persistent, content-addressed OCR results. Keys hash the preprocessed pixels together
+    with the language and engine settings, so any change to those is a clean miss.
+    Entries are evicted least-recently-used once the stored text exceeds `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        try:
+            self._conn = self._open()
+            self._total = self._stored_bytes()
+        except sqlite3.OperationalError:
+            # Locked, read-only or similar: the file may be fine (and in use), so leave it alone
+            raise
+        except sqlite3.DatabaseError as exc:
+            # A corrupt cache is disposable
+            logger.warning("Discarding unreadable OCR cache %s: %s", path, exc)
+            if getattr(self, "_conn", None) is not None:
+                self._conn.close()
+            remove_sqlite_files(path)
+            self._conn = self._open()
+            self._total = self._stored_bytes()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)")
+        except sqlite3.Error:
+            conn.close()  # an open handle would keep Windows from deleting the file
+            raise
+        return conn
+
+    def _stored_bytes(self) -> int:
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return int(row[0])
+
+    @staticmethod
+    def make_key(processed: Image.Image, lang: str, engine_key: str) -> str:
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{processed.mode}|{processed.size}|{lang}|{engine_key}|".encode("utf-8"))
+        h.update(processed.tobytes())
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT text FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        except sqlite3.Error as exc:
+            logger.debug("OCR cache lookup failed: %s", exc)
+            return None
+        logger.debug("OCR cache %s (hits=%d misses=%d)", "hit" if row else "miss", self.hits, self.misses)
+        return row[0] if row else None
+
+    def put(self, key: str, text: str) -> None:
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        try:
+            with self._lock:
+                old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries(key, text, size, last_used) VALUES (?, ?, ?, ?)",
+                    (key, text, size, time.time()),
+                )
+                self._total += size - (int(old[0]) if old else 0)
+                self._evict_locked()
+        except sqlite3.Error as exc:
+            logger.debug("OCR cache store failed: %s", exc)
+
+    def _evict_locked(self) -> None:
+        if self._total <= self.max_bytes:
+            return
+        evicted = 0
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY last_used ASC").fetchall()
+        self._conn.execute("BEGIN")
+        for key, size in rows:
+            if self._total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._total -= int(size)
+            evicted += 1
+        self._conn.execute("COMMIT")
+        logger.debug("OCR cache evicted %d entries (now %d bytes)", evicted, self._total)
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        ratio = (100.0 * self.hits / total) if total else 0.0
+        return f"hits={self.hits} misses={self.misses} hit_rate={ratio:.0f}% size={self._total}B"
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from .ocr import DEFAULT_PSM, OcrBackend, OcrLine, create_ocr_backend, perform_ocr, perform_ocr_lines, warm_up
+from .preprocess import Pipeline
+from .util import atomic_write_text
+
+
+logger = logging.getLogger(__name__)
+
+# Per-process engine, created once by the pool initializer
+_worker_backend: Optional[OcrBackend] = None
+_worker_tesseract_cmd: Optional[str] = None
+
+
+def _init_worker(backend_name: str, tesseract_cmd: Optional[str]) -> None:
+    global _worker_backend, _worker_tesseract_cmd
+    _worker_backend = create_ocr_backend(backend_name, tesseract_cmd)
+    _worker_tesseract_cmd = tesseract_cmd
+
+
+def _warm_up_task(lang: str, pipeline: Optional[Pipeline], psm: int, oem: Optional[int]) -> Tuple[int, float]:
+    return os.getpid(), warm_up(_worker_backend, lang, _worker_tesseract_cmd, pipeline, psm, oem)
+
+
+def _ocr_lines_task(
+    img: Image.Image,
+    lang: str,
+    offset: Tuple[int, int],
+    tag: int,
+    pipeline: Optional[Pipeline],
+    psm: int,
+    oem: Optional[int],
+) -> List[OcrLine]:
+    return perform_ocr_lines(
+        img,
+        lang,
+        _worker_tesseract_cmd,
+        backend=_worker_backend,
+        offset=offset,
+        tag=tag,
+        pipeline=pipeline,
+        psm=psm,
+        oem=oem,
+    )
+
+
+def _ocr_file_task(
+    path: str,
+    out_path: str,
+    lang: str,
+    pipeline: Optional[Pipeline],
+    psm: int,
+    oem: Optional[int],
+) -> int:
+    # Decoding and writing happen in the worker, so only paths cross the process boundary
+    with Image.open(path) as im:
+        im.load()
+        text = perform_ocr(
+            im, lang, _worker_tesseract_cmd, backend=_worker_backend, pipeline=pipeline, psm=psm, oem=oem
+        )
+    atomic_write_text(out_path, text, encoding="utf-8")
+    return len(text)
+
+
+def default_worker_count() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+class OcrProcessPool:
+    """
+    Process pool of OCR engines for work that can be split (tiles, batches).
+    The executor is created on first use so the tray starts fast when parallel OCR is off.
+    """
+
+    def __init__(self, backend_name: str, tesseract_cmd: Optional[str], workers: int = 0) -> None:
+        self.backend_name = backend_name
+        self.tesseract_cmd = tesseract_cmd
+        self.workers = workers if workers > 0 else default_worker_count()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.backend_name, self.tesseract_cmd),
+                )
+                logger.debug("Started OCR process pool with %d workers", self.workers)
+            return self._executor
+
+    def ocr_lines(
+        self,
+        tiles: Sequence[Tuple[Image.Image, Tuple[int, int]]],
+        lang: str,
+        pipeline: Optional[Pipeline] = None,
+        psm: int = DEFAULT_PSM,
+        oem: Optional[int] = None,
+    ) -> List[List[OcrLine]]:
+        """OCR each (image, offset) tile on the pool; results keep the tile order."""
+        pool = self.executor()
+        futures = [
+            pool.submit(_ocr_lines_task, img, lang, offset, idx, pipeline, psm, oem)
+            for idx, (img, offset) in enumerate(tiles)
+        ]
+        return [f.result() for f in futures]
+
+    def warm(
+        self,
+        lang: str,
+        pipeline: Optional[Pipeline] = None,
+        psm: int = DEFAULT_PSM,
+        oem: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> int:
+        """
+        Start every worker process and run a warm-up recognition in each. Returns how many
+        distinct workers reported ready within `timeout` (a busy worker may take two tasks).
+        """
+        pool = self.executor()
+        futures = [pool.submit(_warm_up_task, lang, pipeline, psm, oem) for _ in range(self.workers)]
+        ready = {}
+        for future in futures:
+            pid, elapsed_ms = future.result(timeout=timeout)
+            ready[pid] = elapsed_ms
+        logger.debug("OCR pool warm-up: %s", ", ".join(f"pid {p} {ms:.0f} ms" for p, ms in ready.items()))
+        return len(ready)
+
+    def submit_file(
+        self,
+        path: str,
+        out_path: str,
+        lang: str,
+        pipeline: Optional[Pipeline] = None,
+        psm: int = DEFAULT_PSM,
+        oem: Optional[int] = None,
+    ) -> "Future[int]":
+        """OCR an image file on the pool and write its text to `out_path`; resolves to the text length."""
+        return self.executor().submit(_ocr_file_task, path, out_path, lang, pipeline, psm, oem)
+
+    def close(self) -> None:
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
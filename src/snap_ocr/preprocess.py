@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageChops, ImageFilter
+
+
+logger = logging.getLogger(__name__)
+
+# Stages that map each gray level independently; runs of them are fused into one LUT pass
+_POINT_STAGES = {"contrast", "invert", "binarize_otsu", "binarize_fixed"}
+
+DEFAULT_PREPROCESS: List[Any] = ["grayscale", "text_height", {"contrast": 1.8}]
+
+# Text line heights (ascender to descender, so about twice the x-height). Taller text is shrunk
+# to DEFAULT_TEXT_HEIGHT; text under DEFAULT_MIN_TEXT_HEIGHT is too small to read and is enlarged
+# to it. Ordinary 96-DPI UI text (13-18 px) falls in between and is left alone.
+DEFAULT_TEXT_HEIGHT = 22
+DEFAULT_MIN_TEXT_HEIGHT = 12
+_TEXT_HEIGHT_TOLERANCE = 0.15  # closer than this to the target is left alone
+_TEXT_HEIGHT_SCALE_RANGE = (0.25, 4.0)
+_PROBE_MAX_SIDE = 2000  # height estimation runs on a frame reduced to at most this size
+_PROBE_STRIPS = 8  # vertical strips, so side-by-side columns don't merge their line runs
+_EDGE_THRESHOLD = 40
+
+_last_logged_factor: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    params: Tuple[Tuple[str, Any], ...] = ()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return dict(self.params).get(key, default)
+
+    def label(self) -> str:
+        if not self.params:
+            return self.name
+        args = ",".join(f"{k}={v}" for k, v in self.params)
+        return f"{self.name}({args})"
+
+
+@dataclass
+class PreprocessResult:
+    image: Image.Image
+    scale: float = 1.0  # output pixels per input pixel, for mapping boxes back
+    timings: List[Tuple[str, float]] = field(default_factory=list)
+
+
+def _parse_stage(entry: Any) -> Stage:
+    if isinstance(entry, str):
+        name, value = entry, None
+    elif isinstance(entry, dict) and len(entry) == 1:
+        name, value = next(iter(entry.items()))
+    else:
+        raise ValueError(f"preprocess entries must be a stage name or a one-key mapping, got: {entry!r}")
+    name = str(name).lower()
+    if name == "grayscale":
+        return Stage("grayscale")
+    if name == "contrast":
+        factor = float(value if value is not None else 1.8)
+        if factor < 0:
+            raise ValueError("contrast factor must be >= 0")
+        return Stage("contrast", (("factor", factor),))
+    if name == "invert":
+        mode = "auto" if value in (None, "auto") else bool(value)
+        return Stage("invert", (("mode", mode),))
+    if name == "binarize":
+        if value in (None, "otsu"):
+            return Stage("binarize_otsu")
+        if isinstance(value, int) and not isinstance(value, bool):
+            if not 0 <= value <= 255:
+                raise ValueError("binarize threshold must be 0-255")
+            return Stage("binarize_fixed", (("threshold", value),))
+        opts: Dict[str, Any] = {"method": value} if isinstance(value, str) else dict(value or {})
+        method = str(opts.get("method", "otsu")).lower()
+        if method == "otsu":
+            return Stage("binarize_otsu")
+        if method == "adaptive":
+            block = int(opts.get("block", 31))
+            if block < 3:
+                raise ValueError("adaptive binarize block must be >= 3")
+            return Stage("binarize_adaptive", (("block", block), ("offset", int(opts.get("offset", 10)))))
+        raise ValueError(f"unknown binarize method: {method} (use otsu | adaptive | <threshold>)")
+    if name == "scale":
+        factor = float(value if value is not None else 1.0)
+        if factor <= 0:
+            raise ValueError("scale factor must be positive")
+        return Stage("scale", (("factor", factor),))
+    if name == "text_height":
+        opts = {"target": value} if not isinstance(value, dict) else dict(value)
+        target = float(opts.get("target") or DEFAULT_TEXT_HEIGHT)
+        minimum = float(opts.get("min") or min(DEFAULT_MIN_TEXT_HEIGHT, target))
+        if target <= 0 or minimum <= 0:
+            raise ValueError("text_height target/min must be positive")
+        if minimum > target:
+            raise ValueError("text_height min cannot exceed its target")
+        return Stage("text_height", (("target", target), ("min", minimum)))
+    if name == "dpi":
+        opts = {"target": value} if not isinstance(value, dict) else dict(value)
+        target = float(opts.get("target") or 300)
+        source = float(opts.get("source") or 96)
+        if target <= 0 or source <= 0:
+            raise ValueError("dpi source/target must be positive")
+        return Stage("dpi", (("source", source), ("target", target)))
+    raise ValueError(f"unknown preprocess stage: {name} (use grayscale | contrast | invert | binarize | text_height | dpi | scale)")
+
+
+def _remap_histogram(hist: Sequence[int], lut: Sequence[int]) -> List[int]:
+    out = [0] * 256
+    for level, count in enumerate(hist):
+        if count:
+            out[lut[level]] += count
+    return out
+
+
+def _mean(hist: Sequence[int]) -> float:
+    n = sum(hist)
+    return sum(i * c for i, c in enumerate(hist)) / n if n else 0.0
+
+
+def _otsu_threshold(hist: Sequence[int]) -> int:
+    total = sum(hist)
+    if not total:
+        return 127
+    sum_all = sum(i * c for i, c in enumerate(hist))
+    sum_bg = 0.0
+    weight_bg = 0
+    best_t, best_var = 0, -1.0
+    for t in range(256):
+        weight_bg += hist[t]
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += t * hist[t]
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        var = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if var > best_var:
+            best_t, best_var = t, var
+    return best_t
+
+
+def _fused_lut(hist: Sequence[int], stages: Sequence[Stage]) -> List[int]:
+    """
+    Compose point stages into one lookup table. Statistics each stage needs (mean, Otsu
+    threshold) come from remapping the source histogram, so no extra image passes.
+    """
+    lut = list(range(256))
+    for stage in stages:
+        current = _remap_histogram(hist, lut)
+        if stage.name == "contrast":
+            # Same arithmetic as ImageEnhance.Contrast: blend towards the mean gray level
+            mean = int(_mean(current) + 0.5)
+            factor = stage.get("factor")
+            lut = [max(0, min(255, int(mean + factor * (v - mean)))) for v in lut]
+        elif stage.name == "invert":
+            mode = stage.get("mode")
+            if mode is True or (mode == "auto" and _mean(current) < 128):
+                lut = [255 - v for v in lut]
+        elif stage.name == "binarize_otsu":
+            threshold = _otsu_threshold(current)
+            lut = [255 if v > threshold else 0 for v in lut]
+        elif stage.name == "binarize_fixed":
+            threshold = stage.get("threshold")
+            lut = [255 if v > threshold else 0 for v in lut]
+    return lut
+
+
+class Pipeline:
+    """Ordered preprocessing stages applied before OCR, declared via `preprocess` in config.yaml."""
+
+    def __init__(self, stages: Sequence[Stage]) -> None:
+        self.stages = tuple(stages)
+        self.signature = "|".join(stage.label() for stage in self.stages)
+
+    def with_scale(self, factor: float) -> "Pipeline":
+        """
+        Copy with a leading resample stage (shrinking first keeps later stages cheap). A
+        text_height stage already picks the resample factor, so its heights are scaled instead.
+        """
+        if abs(factor - 1.0) < 0.01:
+            return self
+        if any(stage.name == "text_height" for stage in self.stages):
+            return Pipeline(
+                [
+                    Stage("text_height", (("target", stage.get("target") * factor), ("min", stage.get("min") * factor)))
+                    if stage.name == "text_height"
+                    else stage
+                    for stage in self.stages
+                ]
+            )
+        return Pipeline((Stage("scale", (("factor", float(factor)),)),) + self.stages)
+
+    @classmethod
+    def from_config(cls, spec: Optional[Sequence[Any]]) -> "Pipeline":
+        if spec is None:
+            spec = DEFAULT_PREPROCESS
+        if not isinstance(spec, (list, tuple)):
+            raise ValueError("preprocess must be a list of stages")
+        return cls([_parse_stage(entry) for entry in spec])
+
+    def run(self, img: Image.Image) -> PreprocessResult:
+        result = PreprocessResult(image=img)
+        pending: List[Stage] = []
+
+        def timed(label: str, func) -> None:
+            started = time.perf_counter()
+            result.image = func(result.image)
+            result.timings.append((label, (time.perf_counter() - started) * 1000.0))
+
+        def flush() -> None:
+            if not pending:
+                return
+            stages = list(pending)
+            pending.clear()
+            label = "lut[" + "+".join(s.name for s in stages) + "]"
+            timed(label, lambda im: im.point(_fused_lut(im.histogram(), stages)))
+
+        for stage in self.stages:
+            if stage.name in _POINT_STAGES:
+                if result.image.mode != "L" and not pending:
+                    timed("grayscale", lambda im: im.convert("L"))
+                pending.append(stage)
+                continue
+            flush()
+            if stage.name == "grayscale":
+                if result.image.mode != "L":
+                    timed("grayscale", lambda im: im.convert("L"))
+            elif stage.name == "binarize_adaptive":
+                if result.image.mode != "L":
+                    timed("grayscale", lambda im: im.convert("L"))
+                timed(stage.label(), lambda im: _adaptive_binarize(im, stage.get("block"), stage.get("offset")))
+            elif stage.name == "text_height":
+                factor = _text_height_factor(result.image, stage.get("target"), stage.get("min"))
+                if factor is not None:
+                    timed(f"text_height(x{factor:.2f})", lambda im: _resample(im, factor))
+                    result.scale *= factor
+            elif stage.name in ("dpi", "scale"):
+                factor = stage.get("factor") if stage.name == "scale" else stage.get("target") / stage.get("source")
+                if abs(factor - 1.0) >= 0.01:
+                    timed(stage.label(), lambda im: _resample(im, factor))
+                    result.scale *= factor
+        flush()
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Preprocess %s×%s: %s",
+                img.width,
+                img.height,
+                ", ".join(f"{label} {ms:.1f}ms" for label, ms in result.timings) or "no-op",
+            )
+        return result
+
+
+def estimate_text_height(img: Image.Image) -> Optional[float]:
+    """
+    Dominant text line height in pixels, or None when the frame shows no text-like rows.
+    Rows with edge pixels form runs, one per text line, within each vertical strip; the
+    median run length is the line height (HiDPI frames give about twice the 1x value).
+    """
+    gray = img if img.mode == "L" else img.convert("L")
+    factor = max(1, -(-max(gray.size) // _PROBE_MAX_SIDE))
+    probe = gray.reduce(factor) if factor > 1 else gray
+    if probe.width < _PROBE_STRIPS or probe.height < 8:
+        return None
+    edges = probe.filter(ImageFilter.FIND_EDGES).point(lambda v: 255 if v > _EDGE_THRESHOLD else 0)
+    runs: List[int] = []
+    max_run = probe.height // 3
+    strip_w = probe.width // _PROBE_STRIPS
+    for i in range(_PROBE_STRIPS):
+        # Per-row share of edge pixels in this strip, via one box resample to a single column
+        strip = edges.crop((i * strip_w, 1, (i + 1) * strip_w, probe.height - 1))
+        rows = strip.resize((1, strip.height), Image.BOX).tobytes()
+        run = 0
+        for value in rows + b"\0":
+            if value > 2:
+                run += 1
+                continue
+            if 3 <= run <= max_run:
+                runs.append(run)
+            run = 0
+    if len(runs) < 3:
+        return None
+    runs.sort()
+    return runs[len(runs) // 2] * factor
+
+
+def _text_height_factor(img: Image.Image, target: float, minimum: float) -> Optional[float]:
+    global _last_logged_factor
+    height = estimate_text_height(img)
+    if height is None:
+        logger.debug("Text height: no text lines found; not resampling")
+        return None
+    if height > target:
+        goal = target
+    elif height < minimum:
+        goal = minimum
+    else:
+        logger.debug("Text height %.0f px is within %.0f-%.0f px; not resampling", height, minimum, target)
+        return None
+    low, high = _TEXT_HEIGHT_SCALE_RANGE
+    factor = max(low, min(high, goal / height))
+    if abs(factor - 1.0) < _TEXT_HEIGHT_TOLERANCE:
+        logger.debug("Text height %.0f px is near the %.0f px target; not resampling", height, goal)
+        return None
+    # INFO when the factor changes (e.g. a different screen), so every tile and watch frame doesn't repeat it
+    level = logging.DEBUG if _last_logged_factor == round(factor, 2) else logging.INFO
+    _last_logged_factor = round(factor, 2)
+    logger.log(
+        level,
+        "Text height %.0f px: resampling %s×%s by x%.2f to %.0f px",
+        height,
+        img.width,
+        img.height,
+        factor,
+        goal,
+    )
+    return factor
+
+
+def _adaptive_binarize(gray: Image.Image, block: int, offset: int) -> Image.Image:
+    """Foreground where a pixel is darker than its local mean by more than `offset`."""
+    local_mean = gray.filter(ImageFilter.BoxBlur(block // 2))
+    darker_by = ImageChops.subtract(local_mean, gray)
+    return darker_by.point([255 if d <= offset else 0 for d in range(256)])
+
+
+def _resample(img: Image.Image, factor: float) -> Image.Image:
+    size = (max(1, int(round(img.width * factor))), max(1, int(round(img.height * factor))))
+    return img.resize(size, Image.LANCZOS if factor > 1 else Image.BOX)
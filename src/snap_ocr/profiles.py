@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import os
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from .ocr import DEFAULT_PSM, OcrBackend, perform_ocr
+from .paths import get_state_dir
+from .preprocess import Pipeline
+from .retention import ARCHIVE_DIRNAME
+from .util import atomic_write_text
+
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_FILENAME = "calibration.json"
+IMAGE_EXTENSIONS = (".png", ".webp", ".tif", ".tiff", ".bmp", ".jpg", ".jpeg")
+
+
+@dataclass
+class OcrProfile:
+    """A named speed/accuracy trade-off: engine mode, page segmentation, resample factor, preprocessing."""
+
+    name: str
+    psm: int = DEFAULT_PSM
+    oem: Optional[int] = None  # None = Tesseract default
+    scale: float = 1.0  # resample before preprocessing; < 1 shrinks
+    preprocess: Optional[List[Any]] = None  # None = the configured `preprocess` stages
+    rank: int = 1  # expected accuracy; calibration prefers the highest rank within budget
+
+    def pipeline(self, default: Pipeline) -> Pipeline:
+        base = default if self.preprocess is None else Pipeline.from_config(self.preprocess)
+        return base.with_scale(self.scale)
+
+
+BUILTIN_PROFILES: Dict[str, OcrProfile] = {
+    "fast": OcrProfile("fast", oem=1, scale=0.75, preprocess=["grayscale", "text_height"], rank=0),
+    "balanced": OcrProfile("balanced", rank=1),
+    "accurate": OcrProfile("accurate", oem=1, scale=1.5, rank=2),
+}
+
+
+def load_profiles(custom: Optional[Dict[str, Any]] = None) -> Dict[str, OcrProfile]:
+    """Built-in profiles plus (or overridden by) the `ocr_profiles` mapping from config.yaml."""
+    profiles = dict(BUILTIN_PROFILES)
+    for name, spec in (custom or {}).items():
+        if not isinstance(spec, dict):
+            raise ValueError(f"ocr_profiles.{name} must be a mapping")
+        unknown = set(spec) - {"psm", "oem", "scale", "preprocess", "rank"}
+        if unknown:
+            raise ValueError(f"ocr_profiles.{name} has unknown keys: {', '.join(sorted(unknown))}")
+        profile = OcrProfile(
+            name=str(name),
+            psm=int(spec.get("psm", DEFAULT_PSM)),
+            oem=None if spec.get("oem") is None else int(spec["oem"]),
+            scale=float(spec.get("scale", 1.0)),
+            preprocess=spec.get("preprocess"),
+            rank=int(spec.get("rank", 1)),
+        )
+        if not 0 <= profile.psm <= 13:
+            raise ValueError(f"ocr_profiles.{name}.psm must be 0-13")
+        if profile.oem is not None and not 0 <= profile.oem <= 3:
+            raise ValueError(f"ocr_profiles.{name}.oem must be 0-3")
+        if profile.scale <= 0:
+            raise ValueError(f"ocr_profiles.{name}.scale must be positive")
+        if profile.preprocess is not None:
+            Pipeline.from_config(profile.preprocess)
+        profiles[profile.name] = profile
+    return profiles
+
+
+def resolve_profile(profiles: Dict[str, OcrProfile], name: str, calibration: Optional[Dict[str, Any]]) -> OcrProfile:
+    """Look up a profile by name; "auto" means the one chosen by the last calibration."""
+    if name == "auto":
+        name = (calibration or {}).get("chosen") or "balanced"
+    profile = profiles.get(name)
+    if profile is None:
+        logger.warning("OCR profile %s is not defined; using balanced", name)
+        profile = profiles["balanced"]
+    return profile
+
+
+def calibration_path() -> str:
+    return os.path.join(get_state_dir(), CALIBRATION_FILENAME)
+
+
+def load_calibration() -> Optional[Dict[str, Any]]:
+    try:
+        with open(calibration_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def sample_images(directory: str, limit: int) -> List[str]:
+    """Most recent saved captures, newest first, including those in shard folders."""
+    found: List[Tuple[float, str]] = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        if dirpath == directory:
+            dirnames[:] = [d for d in dirnames if d != ARCHIVE_DIRNAME]
+        for name in filenames:
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                path = os.path.join(dirpath, name)
+                try:
+                    found.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+    return [path for _mtime, path in heapq.nlargest(limit, found)]
+
+
+def calibrate(
+    paths: Sequence[str],
+    profiles: Dict[str, OcrProfile],
+    lang: str,
+    tesseract_cmd: Optional[str],
+    backend: OcrBackend,
+    default_pipeline: Pipeline,
+    budget_ms: int,
+) -> Dict[str, Any]:
+    """
+    Time every profile on the sample captures and pick the most accurate one (highest rank)
+    whose 90th-percentile latency fits the budget; if none fits, the fastest.
+    """
+    images = []
+    for path in paths:
+        with Image.open(path) as im:
+            images.append(im.convert("RGB"))
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, profile in profiles.items():
+        pipeline = profile.pipeline(default_pipeline)
+        timings: List[float] = []
+        # First pass is untimed: engine initialisation is not a per-capture cost
+        for im in [images[0], *images]:
+            started = time.perf_counter()
+            perform_ocr(im, lang, tesseract_cmd, backend=backend, pipeline=pipeline, psm=profile.psm, oem=profile.oem)
+            timings.append((time.perf_counter() - started) * 1000.0)
+        timings = sorted(timings[1:])
+        p90 = timings[min(len(timings) - 1, int(round(0.9 * (len(timings) - 1))))]
+        results[name] = {
+            "median_ms": round(statistics.median(timings), 1),
+            "p90_ms": round(p90, 1),
+            "samples": len(timings),
+            "rank": profile.rank,
+        }
+        logger.info("Calibration %s: median %.0f ms, p90 %.0f ms", name, statistics.median(timings), p90)
+
+    within = [n for n, r in results.items() if r["p90_ms"] <= budget_ms]
+    if within:
+        chosen = max(within, key=lambda n: (results[n]["rank"], -results[n]["p90_ms"]))
+    else:
+        chosen = min(results, key=lambda n: results[n]["p90_ms"])
+    return {
+        "chosen": chosen,
+        "budget_ms": budget_ms,
+        "lang": lang,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+        "profiles": results,
+    }
+
+
+def save_calibration(data: Dict[str, Any]) -> str:
+    path = calibration_path()
+    atomic_write_text(path, json.dumps(data, indent=2, sort_keys=True))
+    return path
@@ -3,8 +3,10 @@ from __future__ import annotations
 import json
 import os
 import sys
+import threading
+from bisect import bisect_right
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
 from pynput import mouse
 import mss
@@ -80,23 +82,27 @@ def _get_cursor_pos() -> Tuple[int, int]:
         return (0, 0)
 
 
-def _get_monitor_under_point_with_index(x: int, y: int) -> Optional[Tuple[int, Dict[str, int]]]:
-    with mss.mss() as sct:
-        monitors = sct.monitors
-        if not monitors:
-            return None
-        if len(monitors) > 1:
-            physical = list(enumerate(monitors[1:], start=0))
-        else:
-            physical = [(0, monitors[0])]
-        for idx, mon in physical:
-            left = int(mon.get("left", 0))
-            top = int(mon.get("top", 0))
-            width = int(mon.get("width", 0))
-            height = int(mon.get("height", 0))
-            if x >= left and y >= top and x < left + width and y < top + height:
-                return idx, mon
-        return physical[0] if physical else None
+def _get_monitor_under_point_with_index(
+    x: int, y: int, monitors: Optional[List[Dict[str, int]]] = None
+) -> Optional[Tuple[int, Dict[str, int]]]:
+    """`monitors` is an mss-style list (virtual screen first); read from a fresh mss handle when omitted."""
+    if monitors is None:
+        with mss.mss() as sct:
+            monitors = [dict(m) for m in sct.monitors]
+    if not monitors:
+        return None
+    if len(monitors) > 1:
+        physical = list(enumerate(monitors[1:], start=0))
+    else:
+        physical = [(0, monitors[0])]
+    for idx, mon in physical:
+        left = int(mon.get("left", 0))
+        top = int(mon.get("top", 0))
+        width = int(mon.get("width", 0))
+        height = int(mon.get("height", 0))
+        if x >= left and y >= top and x < left + width and y < top + height:
+            return idx, mon
+    return physical[0] if physical else None
 
 
 def _get_monitor_under_point(x: int, y: int) -> Optional[Dict[str, int]]:
@@ -106,6 +112,81 @@ def _get_monitor_under_point(x: int, y: int) -> Optional[Dict[str, int]]:
     return info[1]
 
 
+class ZoneIndex:
+    """
+    Zones in absolute screen pixels, in layout order, with an x-slab index for cursor lookups:
+    each slab between neighbouring zone edges lists the zones spanning it, so a lookup bisects
+    to one slab and tests only those zones. Overlaps resolve to the earliest zone, as before.
+    """
+
+    def __init__(self, zones: List[Dict[str, int]]) -> None:
+        self.zones = zones
+        edges = sorted({z["left"] for z in zones} | {z["left"] + z["width"] for z in zones})
+        self._edges = edges
+        self._slabs: List[List[int]] = []
+        for lo in edges[:-1]:
+            self._slabs.append([i for i, z in enumerate(zones) if z["left"] <= lo < z["left"] + z["width"]])
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    def at(self, x: int, y: int) -> Optional[Dict[str, int]]:
+        slab = bisect_right(self._edges, x) - 1
+        if slab < 0 or slab >= len(self._slabs):
+            return None
+        for i in self._slabs[slab]:
+            z = self.zones[i]
+            if z["top"] <= y < z["top"] + z["height"]:
+                return z
+        return None
+
+    def pick(self, x: int, y: int, prefer_under_cursor: bool, zone_index: int) -> Dict[str, int]:
+        if prefer_under_cursor:
+            hit = self.at(x, y)
+            if hit is not None:
+                return dict(hit)
+        idx = zone_index if 0 <= zone_index < len(self.zones) else (len(self.zones) - 1)
+        return dict(self.zones[idx])
+
+
+# Parsed and scaled zone sets, keyed by source + monitor geometry and stamped with the
+# layout files' (mtime, size); a hotkey press only stats the files unless they changed.
+_zone_cache: Dict[Hashable, Tuple[Any, Optional[ZoneIndex]]] = {}
+_zone_cache_lock = threading.Lock()
+
+
+def _file_stamps(paths: List[str]) -> Tuple[Optional[Tuple[int, int]], ...]:
+    stamps: List[Optional[Tuple[int, int]]] = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stamps.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+def _cached_zones(key: Hashable, paths: List[str], build: Callable[[], Optional[ZoneIndex]]) -> Optional[ZoneIndex]:
+    stamp = _file_stamps(paths)
+    with _zone_cache_lock:
+        hit = _zone_cache.get(key)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+    zones = build()
+    with _zone_cache_lock:
+        _zone_cache[key] = (stamp, zones)
+    return zones
+
+
+def clear_zone_cache() -> None:
+    with _zone_cache_lock:
+        _zone_cache.clear()
+
+
+def _monitor_key(mon: Dict[str, int]) -> Tuple[int, int, int, int]:
+    return (int(mon.get("left", 0)), int(mon.get("top", 0)), int(mon.get("width", 0)), int(mon.get("height", 0)))
+
+
 def _fz_dir() -> str:
     if sys.platform != "win32":
         raise SnapOcrError(ErrorCode.OTHER, "FancyZones only available on Windows.")
@@ -210,11 +291,10 @@ def _get_zones_info_for_any_canvas() -> Optional[Tuple[List[Dict[str, int]], int
     return None
 
 
-def get_fancyzones_region(prefer_under_cursor: bool = True, zone_index: int = 0) -> Optional[Dict[str, int]]:
-    x, y = _get_cursor_pos()
-    mon = _get_monitor_under_point(x, y)
-    if not mon:
-        return None
+_FZ_FILES = ("zones-settings.json", "applied-layouts.json", "custom-layouts.json")
+
+
+def _fancyzones_index(mon: Dict[str, int]) -> Optional[ZoneIndex]:
     info = _get_zones_info_for_any_canvas()
     if not info:
         return None
@@ -224,31 +304,37 @@ def get_fancyzones_region(prefer_under_cursor: bool = True, zone_index: int = 0)
     scale_y = mon["height"] / refh if refh else 1.0
     scaled: List[Dict[str, int]] = []
     for z in zones:
-        sx = int(round(z["x"] * scale_x))
-        sy = int(round(z["y"] * scale_y))
-        sw = int(round(z["width"] * scale_x))
-        sh = int(round(z["height"] * scale_y))
-        scaled.append({"x": sx, "y": sy, "width": sw, "height": sh})
-    if not scaled:
+        scaled.append(
+            {
+                "left": mon["left"] + int(round(z["x"] * scale_x)),
+                "top": mon["top"] + int(round(z["y"] * scale_y)),
+                "width": int(round(z["width"] * scale_x)),
+                "height": int(round(z["height"] * scale_y)),
+            }
+        )
+    return ZoneIndex(scaled) if scaled else None
+
+
+def get_fancyzones_region(
+    prefer_under_cursor: bool = True,
+    zone_index: int = 0,
+    monitors: Optional[List[Dict[str, int]]] = None,
+) -> Optional[Dict[str, int]]:
+    """`monitors` is an mss-style list; pass the capture backend's to avoid opening a new handle."""
+    x, y = _get_cursor_pos()
+    found = _get_monitor_under_point_with_index(x, y, monitors=monitors)
+    if not found:
         return None
-    if prefer_under_cursor:
-        rel_x, rel_y = x - mon["left"], y - mon["top"]
-        for z in scaled:
-            if rel_x >= z["x"] and rel_y >= z["y"] and rel_x < z["x"] + z["width"] and rel_y < z["y"] + z["height"]:
-                return {
-                    "left": mon["left"] + z["x"],
-                    "top": mon["top"] + z["y"],
-                    "width": z["width"],
-                    "height": z["height"],
-                }
-    idx = zone_index if 0 <= zone_index < len(scaled) else (len(scaled) - 1)
-    z = scaled[idx]
-    return {
-        "left": mon["left"] + z["x"],
-        "top": mon["top"] + z["y"],
-        "width": z["width"],
-        "height": z["height"],
-    }
+    mon = found[1]
+    base = _fz_dir()
+    index = _cached_zones(
+        ("fancyzones", base, _monitor_key(mon)),
+        [os.path.join(base, name) for name in _FZ_FILES],
+        lambda: _fancyzones_index(mon),
+    )
+    if not index:
+        return None
+    return index.pick(x, y, prefer_under_cursor, zone_index)
 
 
 def _macsyzones_dir() -> Path:
@@ -303,29 +389,11 @@ def _load_macsyzones_screen_layouts(base: Path) -> Dict[int, str]:
     return mapping
 
 
-def get_macsyzones_region(
-    prefer_under_cursor: bool = True,
-    zone_index: int = 0,
-    layout_name: Optional[str] = None,
-) -> Optional[Dict[str, int]]:
-    if sys.platform != "darwin":
-        raise SnapOcrError(ErrorCode.OTHER, "MacsyZones capture is only available on macOS.")
-
-    cursor_x, cursor_y = _get_cursor_pos()
-    monitor_info = _get_monitor_under_point_with_index(cursor_x, cursor_y)
-    if not monitor_info:
-        return None
-    screen_index, monitor = monitor_info
-
+def _macsyzones_index(
+    base: Path, monitor: Dict[str, int], screen_index: int, layout_name: Optional[str]
+) -> Optional[ZoneIndex]:
     width = int(monitor.get("width", 0))
     height = int(monitor.get("height", 0))
-    if width <= 0 or height <= 0:
-        return None
-
-    base = _macsyzones_dir()
-    if not base.exists():
-        return None
-
     layouts = _load_macsyzones_layouts(base)
     if not layouts:
         return None
@@ -364,26 +432,39 @@ def get_macsyzones_region(
         top = mon_top + int(round((1.0 - (zy + zh)) * height))
         w_px = max(1, int(round(zw * width)))
         h_px = max(1, int(round(zh * height)))
-        scaled.append({"x": left, "y": top, "width": w_px, "height": h_px})
+        scaled.append({"left": left, "top": top, "width": w_px, "height": h_px})
+
+    return ZoneIndex(scaled) if scaled else None
+
 
-    if not scaled:
+def get_macsyzones_region(
+    prefer_under_cursor: bool = True,
+    zone_index: int = 0,
+    layout_name: Optional[str] = None,
+    monitors: Optional[List[Dict[str, int]]] = None,
+) -> Optional[Dict[str, int]]:
+    """`monitors` is an mss-style list; pass the capture backend's to avoid opening a new handle."""
+    if sys.platform != "darwin":
+        raise SnapOcrError(ErrorCode.OTHER, "MacsyZones capture is only available on macOS.")
+
+    cursor_x, cursor_y = _get_cursor_pos()
+    monitor_info = _get_monitor_under_point_with_index(cursor_x, cursor_y, monitors=monitors)
+    if not monitor_info:
         return None
+    screen_index, monitor = monitor_info
 
-    if prefer_under_cursor:
-        for z in scaled:
-            if cursor_x >= z["x"] and cursor_y >= z["y"] and cursor_x < z["x"] + z["width"] and cursor_y < z["y"] + z["height"]:
-                return {
-                    "left": z["x"],
-                    "top": z["y"],
-                    "width": z["width"],
-                    "height": z["height"],
-                }
-
-    idx = zone_index if 0 <= zone_index < len(scaled) else (len(scaled) - 1)
-    z = scaled[idx]
-    return {
-        "left": z["x"],
-        "top": z["y"],
-        "width": z["width"],
-        "height": z["height"],
-    }
+    if int(monitor.get("width", 0)) <= 0 or int(monitor.get("height", 0)) <= 0:
+        return None
+
+    base = _macsyzones_dir()
+    if not base.exists():
+        return None
+
+    index = _cached_zones(
+        ("macsyzones", str(base), _monitor_key(monitor), screen_index, layout_name),
+        [str(base / "UserLayouts.json"), str(base / "SpaceLayoutPreferences.json")],
+        lambda: _macsyzones_index(base, monitor, screen_index, layout_name),
+    )
+    if not index:
+        return None
+    return index.pick(cursor_x, cursor_y, prefer_under_cursor, zone_index)
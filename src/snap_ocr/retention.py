@@ -0,0 +1,406 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .encoding import IMAGE_FORMATS
+from .layout import CaptureNames
+from .ocr import OUTPUT_EXTENSIONS
+from .util import atomic_write_text
+
+if TYPE_CHECKING:
+    from .search_index import SearchIndex
+
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIRNAME = "_archive"  # inside save_dir_images; one zip bundle + JSON index per capture day
+_BUNDLE_PREFIX = "captures-"
+_CAPTURE_SUFFIXES = {f".{ext}" for ext in (*IMAGE_FORMATS.values(), *OUTPUT_EXTENSIONS.values())}
+_IMAGE_SUFFIXES = tuple(f".{ext}" for ext in IMAGE_FORMATS.values())
+_STORED_SUFFIXES = (".png", ".webp", ".pdf")  # already compressed; deflating them again only costs CPU
+_FIRST_PASS_DELAY_S = 60.0  # leave start-up (warm-up, first captures) alone
+
+
+@dataclass
+class Capture:
+    """One capture's files across both output folders, grouped by their relative stem."""
+
+    stem: str  # relative path without extension, e.g. "2024/05/01/snap_20240501_093000"
+    captured_at: float
+    files: List[Tuple[str, str]] = field(default_factory=list)  # (member name in a bundle, path on disk)
+    size: int = 0
+
+
+@dataclass
+class RetentionStats:
+    live: int = 0
+    live_bytes: int = 0
+    bundles: int = 0
+    bundle_bytes: int = 0
+    archived: int = 0
+    evicted: int = 0
+    evicted_bundles: int = 0
+    freed_bytes: int = 0
+    elapsed_s: float = 0.0
+
+    def summary(self) -> str:
+        mb = 1024 * 1024
+        return (
+            f"{self.live} captures on disk ({self.live_bytes / mb:.1f} MB), {self.bundles} archive bundles "
+            f"({self.bundle_bytes / mb:.1f} MB); this pass archived {self.archived}, evicted {self.evicted} "
+            f"captures and {self.evicted_bundles} bundles, freed {self.freed_bytes / mb:.1f} MB in {self.elapsed_s:.1f}s"
+        )
+
+
+def scan_captures(images_dir: str, text_dir: str, names: CaptureNames) -> List[Capture]:
+    """
+    Every capture under the output folders (any shard depth), oldest first. Only files this
+    app writes count: an image or OCR output extension and a stem `names` can date. Anything
+    else in the folders is left alone.
+    """
+    captures: Dict[str, Capture] = {}
+    seen: Set[str] = set()
+    for tag, root in (("images", images_dir), ("text", text_dir)):
+        if not os.path.isdir(root):
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            if os.path.abspath(dirpath) == os.path.abspath(images_dir):
+                dirnames[:] = [d for d in dirnames if d != ARCHIVE_DIRNAME]
+            for name in filenames:
+                base, ext = os.path.splitext(name)
+                if ext.lower() not in _CAPTURE_SUFFIXES:
+                    continue
+                when = names.parse(base)
+                if when is None:
+                    continue
+                path = os.path.join(dirpath, name)
+                real = os.path.realpath(path)
+                if real in seen:  # save_dir_images and save_dir_text may be the same folder
+                    continue
+                seen.add(real)
+                try:
+                    size = os.stat(path).st_size
+                except OSError:
+                    continue
+                rel = os.path.relpath(path, root)
+                stem = os.path.splitext(rel)[0]
+                capture = captures.get(stem)
+                if capture is None:
+                    capture = captures[stem] = Capture(stem, time.mktime(when))
+                capture.files.append((f"{tag}/{rel.replace(os.sep, '/')}", path))
+                capture.size += size
+    return sorted(captures.values(), key=lambda c: c.captured_at)
+
+
+def _bundle_paths(archive_dir: str, day: str) -> Tuple[str, str]:
+    base = os.path.join(archive_dir, f"{_BUNDLE_PREFIX}{day}")
+    return base + ".zip", base + ".json"
+
+
+def _load_bundle_index(path: str) -> Dict[str, Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("captures", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def list_bundles(archive_dir: str) -> List[Tuple[str, str, str]]:
+    """(day, zip path, index path) for every bundle, oldest day first."""
+    if not os.path.isdir(archive_dir):
+        return []
+    out = []
+    for name in sorted(os.listdir(archive_dir)):
+        if name.startswith(_BUNDLE_PREFIX) and name.endswith(".zip"):
+            day = name[len(_BUNDLE_PREFIX) : -len(".zip")]
+            out.append((day, *_bundle_paths(archive_dir, day)))
+    return out
+
+
+def archive_captures(
+    captures: List[Capture],
+    archive_dir: str,
+    roots: Tuple[str, ...] = (),
+    on_moved: Optional[Callable[[List[Tuple[str, str]]], None]] = None,
+) -> int:
+    """
+    Append captures to their day's zip bundle and record them in the bundle's JSON index, then
+    delete the originals. Members already in a bundle are not written again, so a pass that
+    was interrupted between the two steps is finished by the next one. `on_moved` receives
+    (old path, "bundle.zip:member") pairs, e.g. to keep archived text searchable.
+    """
+    by_day: Dict[str, List[Capture]] = {}
+    for capture in captures:
+        by_day.setdefault(time.strftime("%Y-%m-%d", time.localtime(capture.captured_at)), []).append(capture)
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = 0
+    for day, group in sorted(by_day.items()):
+        zip_path, index_path = _bundle_paths(archive_dir, day)
+        done: List[Capture] = []
+        try:
+            # strict_timestamps=False clamps pre-1980 mtimes, which zip can't represent
+            with zipfile.ZipFile(zip_path, "a", compression=zipfile.ZIP_DEFLATED, strict_timestamps=False) as zf:
+                existing = set(zf.namelist())
+                for capture in group:
+                    try:
+                        for member, path in capture.files:
+                            if member not in existing:
+                                stored = path.lower().endswith(_STORED_SUFFIXES)
+                                compress = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+                                zf.write(path, member, compress_type=compress)
+                    except (OSError, ValueError) as exc:
+                        # Left on disk; members it already wrote are skipped when it is retried
+                        logger.warning("Not archiving %s: %s", capture.stem, exc)
+                        continue
+                    done.append(capture)
+            # Reopened writable: Windows can only flush a handle opened for writing
+            with open(zip_path, "r+b") as f:
+                os.fsync(f.fileno())
+        except (OSError, zipfile.BadZipFile) as exc:
+            logger.warning("Failed to update archive bundle %s: %s", zip_path, exc)
+            continue
+        group = done
+        index = _load_bundle_index(index_path)
+        for capture in group:
+            index[capture.stem] = {"captured_at": capture.captured_at, "members": [m for m, _ in capture.files]}
+        atomic_write_text(index_path, json.dumps({"captures": index}, indent=1, sort_keys=True))
+
+        moved: List[Tuple[str, str]] = []
+        for capture in group:
+            for member, path in capture.files:
+                try:
+                    os.remove(path)
+                except OSError as exc:
+                    logger.warning("Archived %s but could not delete it: %s", path, exc)
+                    continue
+                moved.append((path, f"{zip_path}:{member}"))
+                _prune_empty_dirs(os.path.dirname(path), roots)
+            archived += 1
+        if on_moved is not None and moved:
+            on_moved(moved)
+    return archived
+
+
+def restore_capture(archive_dir: str, stem: str, images_dir: str, text_dir: str) -> List[str]:
+    """
+    Extract an archived capture back to its original place. `stem` is the relative stem or
+    just the file name without extension. Returns the restored paths (empty if not found).
+    """
+    roots = {"images": images_dir, "text": text_dir}
+    for _day, zip_path, index_path in reversed(list_bundles(archive_dir)):
+        index = _load_bundle_index(index_path)
+        key = stem if stem in index else next((k for k in index if os.path.basename(k) == stem), None)
+        if key is None:
+            continue
+        restored: List[str] = []
+        with zipfile.ZipFile(zip_path) as zf:
+            for member in index[key]["members"]:
+                tag, rel = member.split("/", 1)
+                dest = os.path.join(roots[tag], *rel.split("/"))
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                with zf.open(member) as src, open(dest, "wb") as out:
+                    while True:
+                        chunk = src.read(1 << 20)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                restored.append(dest)
+        return restored
+    return []
+
+
+def iter_archived_text(archive_dir: str) -> Iterator[Tuple[str, str, float, str]]:
+    """(text ref, image ref, captured_at, text) for every archived capture with a .txt member."""
+    for _day, zip_path, index_path in list_bundles(archive_dir):
+        index = _load_bundle_index(index_path)
+        try:
+            with zipfile.ZipFile(zip_path) as zf:
+                for entry in index.values():
+                    members = entry.get("members", [])
+                    txt = next((m for m in members if m.endswith(".txt")), None)
+                    if txt is None:
+                        continue
+                    img = next((m for m in members if m.lower().endswith(_IMAGE_SUFFIXES)), "")
+                    text = zf.read(txt).decode("utf-8", errors="replace")
+                    img_ref = f"{zip_path}:{img}" if img else ""
+                    yield f"{zip_path}:{txt}", img_ref, float(entry.get("captured_at", 0.0)), text
+        except (OSError, KeyError, zipfile.BadZipFile) as exc:
+            logger.warning("Skipping unreadable archive bundle %s: %s", zip_path, exc)
+
+
+def _prune_empty_dirs(path: str, roots: Tuple[str, ...]) -> None:
+    """Drop shard folders left empty, walking up to (but never removing) the output roots."""
+    stop = {os.path.abspath(root) for root in roots}
+    path = os.path.abspath(path)
+    try:
+        while path not in stop and os.path.dirname(path) != path and not os.listdir(path):
+            os.rmdir(path)
+            path = os.path.dirname(path)
+    except OSError:
+        pass
+
+
+def evict_oldest(
+    captures: List[Capture],
+    archive_dir: str,
+    max_total_bytes: int,
+    roots: Tuple[str, ...] = (),
+    on_removed: Optional[Callable[[List[str]], None]] = None,
+    stats: Optional[RetentionStats] = None,
+) -> RetentionStats:
+    """
+    Delete the oldest data until captures plus archive bundles fit in `max_total_bytes`.
+    Bundles go whole (they hold one day each) and compete with loose captures by age.
+    `on_removed` receives the deleted paths, bundle members as "bundle.zip:member".
+    """
+    stats = stats or RetentionStats()
+    items: List[Tuple[float, int, Optional[Capture], Optional[Tuple[str, str]]]] = []
+    total = 0
+    for capture in captures:
+        items.append((capture.captured_at, capture.size, capture, None))
+        total += capture.size
+    for day, zip_path, index_path in list_bundles(archive_dir):
+        size = sum(os.path.getsize(p) for p in (zip_path, index_path) if os.path.exists(p))
+        try:
+            when = time.mktime(time.strptime(day, "%Y-%m-%d"))
+        except ValueError:
+            when = os.path.getmtime(zip_path)
+        items.append((when, size, None, (zip_path, index_path)))
+        total += size
+    items.sort(key=lambda item: item[0])
+
+    for _when, size, capture, bundle in items:
+        if total <= max_total_bytes:
+            break
+        removed: List[str] = []
+        if capture is not None:
+            for _member, path in capture.files:
+                try:
+                    os.remove(path)
+                except OSError as exc:
+                    logger.warning("Failed to evict %s: %s", path, exc)
+                    continue
+                removed.append(path)
+                _prune_empty_dirs(os.path.dirname(path), roots)
+            stats.evicted += 1
+        elif bundle is not None:
+            zip_path, index_path = bundle
+            members = [m for entry in _load_bundle_index(index_path).values() for m in entry.get("members", [])]
+            try:
+                os.remove(zip_path)
+            except OSError as exc:
+                logger.warning("Failed to evict %s: %s", zip_path, exc)
+                continue
+            try:
+                os.remove(index_path)
+            except OSError:
+                pass
+            removed.extend(f"{zip_path}:{member}" for member in members)
+            stats.evicted_bundles += 1
+        total -= size
+        stats.freed_bytes += size
+        if on_removed is not None and removed:
+            on_removed(removed)
+    return stats
+
+
+def disk_usage(captures: List[Capture], archive_dir: str, stats: RetentionStats) -> None:
+    stats.live = len(captures)
+    stats.live_bytes = sum(c.size for c in captures)
+    bundles = list_bundles(archive_dir)
+    stats.bundles = len(bundles)
+    stats.bundle_bytes = sum(os.path.getsize(p) for _, z, i in bundles for p in (z, i) if os.path.exists(p))
+
+
+class RetentionService:
+    """
+    Background thread that periodically compacts captures older than `archive_after_days`
+    into per-day zip bundles and, when `max_total_bytes` is set, evicts the oldest data to
+    stay under it. Each pass logs the resulting disk usage. `index` returns the current
+    search index (or None), which is kept pointing at archived text and dropped for
+    evicted captures.
+    """
+
+    def __init__(
+        self,
+        images_dir: str,
+        text_dir: str,
+        names: CaptureNames,
+        archive_after_days: int = 0,
+        max_total_bytes: int = 0,
+        interval_s: float = 3600.0,
+        index: Optional[Callable[[], Optional["SearchIndex"]]] = None,
+    ) -> None:
+        self.images_dir = images_dir
+        self.text_dir = text_dir
+        self.names = names
+        self.archive_dir = os.path.join(images_dir, ARCHIVE_DIRNAME)
+        self.archive_after_days = archive_after_days
+        self.max_total_bytes = max_total_bytes
+        self.interval_s = interval_s
+        self._index = index or (lambda: None)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.archive_after_days > 0 or self.max_total_bytes > 0
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="snap-ocr-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self) -> RetentionStats:
+        started = time.monotonic()
+        stats = RetentionStats()
+        roots = (self.images_dir, self.text_dir)
+        captures = scan_captures(self.images_dir, self.text_dir, self.names)
+        if self.archive_after_days > 0:
+            cutoff = time.time() - self.archive_after_days * 86400
+            old = [c for c in captures if c.captured_at < cutoff]
+            if old:
+                stats.archived = archive_captures(old, self.archive_dir, roots, self._relocate)
+                captures = scan_captures(self.images_dir, self.text_dir, self.names)
+        if self.max_total_bytes > 0:
+            evict_oldest(captures, self.archive_dir, self.max_total_bytes, roots, self._forget, stats)
+            if stats.evicted:
+                captures = scan_captures(self.images_dir, self.text_dir, self.names)
+        disk_usage(captures, self.archive_dir, stats)
+        stats.elapsed_s = time.monotonic() - started
+        return stats
+
+    def _run(self) -> None:
+        delay = _FIRST_PASS_DELAY_S
+        while not self._stop.wait(delay):
+            try:
+                logger.info("Retention: %s", self.run_once().summary())
+            except Exception as exc:
+                logger.warning("Retention pass failed: %s", exc)
+            delay = self.interval_s
+
+    def _relocate(self, moves: List[Tuple[str, str]]) -> None:
+        index = self._index()
+        if index is not None:
+            index.relocate(moves)
+
+    def _forget(self, paths: List[str]) -> None:
+        index = self._index()
+        if index is not None:
+            for path in paths:
+                if path.endswith(".txt"):
+                    index.remove(path)
@@ -1,51 +1,125 @@
 from __future__ import annotations
 
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
 from PIL import Image
 import mss
 
 from .errors import ErrorCode, SnapOcrError
 
 
-def capture_full_screenshot() -> Image.Image:
+logger = logging.getLogger(__name__)
+
+
+def _to_image(shot: Any) -> Image.Image:
+    """
+    Decode an mss grab straight from its BGRA buffer: one conversion pass into the image,
+    instead of building `shot.rgb` in Python and copying that again.
+    """
+    return Image.frombuffer("RGB", shot.size, shot.raw, "raw", "BGRX", 0, 1)
+
+
+class CaptureBackend:
     """
-    Capture the full virtual screen across all monitors (monitor 0 in mss).
-    Returns a PIL Image in RGB.
+    Long-lived screen grabber owned by App. mss handles are bound to the thread that opened
+    them (X11 display, GDI device context), so each thread lazily opens one and keeps it.
+    Short-lived threads (tray clicks, watch loops) call release_thread() before exiting, or
+    every one of them would hold a display connection until shutdown.
     """
-    try:
-        with mss.mss() as sct:
-            monitor = sct.monitors[0]
-            sct_img = sct.grab(monitor)
-            img = Image.frombytes("RGB", sct_img.size, sct_img.rgb)
-            return img
-    except mss.exception.ScreenShotError as e:  # type: ignore[attr-defined]
-        # Common on macOS without permissions
-        raise SnapOcrError(
-            ErrorCode.SCREENSHOT_PERMISSION,
-            "Screen capture failed; likely missing Screen Recording permission.",
-            e,
-        )
-
-
-def capture_region(left: int, top: int, width: int, height: int) -> Image.Image:
-    bbox = {"left": int(left), "top": int(top), "width": int(width), "height": int(height)}
-    if bbox["width"] <= 0 or bbox["height"] <= 0:
-        raise SnapOcrError(ErrorCode.CAPTURE_FAILED, f"Invalid region size: {bbox}")
-    try:
-        with mss.mss() as sct:
-            sct_img = sct.grab(bbox)
-            img = Image.frombytes("RGB", sct_img.size, sct_img.rgb)
-            return img
-    except mss.exception.ScreenShotError as e:  # type: ignore[attr-defined]
-        raise SnapOcrError(
-            ErrorCode.SCREENSHOT_PERMISSION,
-            "Region capture failed; likely missing permission or invalid region.",
-            e,
-        )
-    except Exception as e:
-        raise SnapOcrError(ErrorCode.CAPTURE_FAILED, f"Failed to capture region: {e}", e)
-    except Exception as e:
-        raise SnapOcrError(
-            ErrorCode.CAPTURE_FAILED,
-            f"Failed to capture screen: {e}",
-            e,
-        )
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._handles: List[Any] = []
+        self._lock = threading.Lock()
+        self._layout: Optional[List[Dict[str, int]]] = None
+        # Called with the new layout when monitors() sees displays added, removed or moved
+        self.on_layout_change: Optional[Callable[[List[Dict[str, int]]], None]] = None
+
+    def _sct(self) -> Any:
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = mss.mss()
+            self._local.sct = sct
+            with self._lock:
+                self._handles.append(sct)
+            logger.debug("Opened capture handle for thread %s", threading.current_thread().name)
+        return sct
+
+    def release_thread(self) -> None:
+        """Close the calling thread's handle, if it opened one."""
+        sct = getattr(self._local, "sct", None)
+        self._local.sct = None
+        if sct is not None:
+            with self._lock:
+                if sct in self._handles:
+                    self._handles.remove(sct)
+            try:
+                sct.close()
+            except Exception:
+                pass
+
+    def frame(self, bbox: Dict[str, int]) -> Any:
+        """
+        Raw BGRA grab (an mss ScreenShot). `shot.raw` is the pixel buffer and
+        `numpy.asarray(shot)` gives an HxWx4 view of it without copying.
+        """
+        try:
+            return self._sct().grab(bbox)
+        except mss.exception.ScreenShotError:  # type: ignore[attr-defined]
+            # Handles can go stale (display sleep, session switch); reopen once before giving up
+            self.release_thread()
+            return self._sct().grab(bbox)
+
+    def grab(self, bbox: Dict[str, int]) -> Image.Image:
+        return _to_image(self.frame(bbox))
+
+    def monitors(self) -> List[Dict[str, int]]:
+        sct = self._sct()
+        # mss caches the layout per handle; clearing it re-enumerates displays without reopening
+        sct._monitors = []
+        layout = [dict(m) for m in sct.monitors]
+        with self._lock:
+            changed = self._layout is not None and layout != self._layout
+            self._layout = layout
+        if changed and self.on_layout_change is not None:
+            logger.info("Display layout changed: %d monitor(s)", max(1, len(layout) - 1))
+            self.on_layout_change(layout)
+        return layout
+
+    def full(self) -> Image.Image:
+        """Full virtual screen across all monitors (monitor 0 in mss), in RGB."""
+        try:
+            return self.grab(self.monitors()[0])
+        except mss.exception.ScreenShotError as e:  # type: ignore[attr-defined]
+            raise SnapOcrError(
+                ErrorCode.SCREENSHOT_PERMISSION,
+                "Screen capture failed; likely missing Screen Recording permission.",
+                e,
+            )
+
+    def region(self, left: int, top: int, width: int, height: int) -> Image.Image:
+        bbox = {"left": int(left), "top": int(top), "width": int(width), "height": int(height)}
+        if bbox["width"] <= 0 or bbox["height"] <= 0:
+            raise SnapOcrError(ErrorCode.CAPTURE_FAILED, f"Invalid region size: {bbox}")
+        try:
+            return self.grab(bbox)
+        except mss.exception.ScreenShotError as e:  # type: ignore[attr-defined]
+            raise SnapOcrError(
+                ErrorCode.SCREENSHOT_PERMISSION,
+                "Region capture failed; likely missing permission or invalid region.",
+                e,
+            )
+        except Exception as e:
+            raise SnapOcrError(ErrorCode.CAPTURE_FAILED, f"Failed to capture region: {e}", e)
+
+    def close(self) -> None:
+        with self._lock:
+            handles = list(self._handles)
+            self._handles.clear()
+        for sct in handles:
+            try:
+                sct.close()
+            except Exception:
+                pass
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .encoding import IMAGE_FORMATS
+from .retention import ARCHIVE_DIRNAME, iter_archived_text
+from .util import remove_sqlite_files
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "search-index.sqlite3"
+
+_REINDEX_BATCH = 500  # rows per transaction during --reindex
+_IMAGE_SUFFIXES = tuple(f".{ext}" for ext in IMAGE_FORMATS.values())
+
+
+@dataclass
+class SearchHit:
+    txt_path: str
+    img_path: str
+    captured_at: float
+    mode: str
+    region: str
+    snippet: str
+    score: float
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 index over saved OCR text. One `captures` row per text file holds the
+    metadata; the FTS table shares its rowid and stores the text for ranking and snippets.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            self._conn = self._open()
+        except sqlite3.OperationalError:
+            # Locked, read-only or similar: the file may be fine (and in use), so leave it alone
+            raise
+        except sqlite3.DatabaseError as exc:
+            # The index is rebuilt from the text files with --reindex, so a broken one is disposable
+            logger.warning("Discarding unreadable search index %s: %s", path, exc)
+            remove_sqlite_files(path)
+            self._conn = self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS captures ("
+                "id INTEGER PRIMARY KEY, txt_path TEXT NOT NULL UNIQUE, img_path TEXT NOT NULL, "
+                "captured_at REAL NOT NULL, mode TEXT NOT NULL, region TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS captures_captured_at ON captures(captured_at)")
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS captures_fts USING fts5(text, tokenize='unicode61')")
+        except sqlite3.Error:
+            conn.close()  # an open handle would keep Windows from deleting the file
+            raise
+        return conn
+
+    def add(
+        self,
+        txt_path: str,
+        img_path: str,
+        captured_at: float,
+        mode: str = "",
+        region: str = "",
+        text: Optional[str] = None,
+    ) -> None:
+        """Index one capture; without `text` (e.g. a duplicate whose source text is unknown) nothing is added."""
+        if text is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN")
+                self._upsert_locked(txt_path, img_path, captured_at, mode, region, text)
+                self._conn.execute("COMMIT")
+        except sqlite3.Error as exc:
+            logger.warning("Search index update failed for %s: %s", txt_path, exc)
+            self._rollback()
+
+    def text_of(self, txt_path: str) -> Optional[str]:
+        """Indexed text of a capture, or None if it isn't indexed."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT f.text FROM captures c JOIN captures_fts f ON f.rowid = c.id WHERE c.txt_path = ?",
+                    (txt_path,),
+                ).fetchone()
+        except sqlite3.Error as exc:
+            logger.debug("Search index lookup failed for %s: %s", txt_path, exc)
+            return None
+        return row[0] if row else None
+
+    def remove(self, txt_path: str) -> None:
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN")
+                self._delete_locked(txt_path)
+                self._conn.execute("COMMIT")
+        except sqlite3.Error as exc:
+            logger.debug("Search index removal failed for %s: %s", txt_path, exc)
+            self._rollback()
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """Best matches first (BM25). Plain words are matched literally if the query isn't valid FTS5 syntax."""
+        sql = (
+            "SELECT c.txt_path, c.img_path, c.captured_at, c.mode, c.region, "
+            "snippet(captures_fts, 0, '[', ']', '…', 12), bm25(captures_fts) AS score "
+            "FROM captures_fts JOIN captures c ON c.id = captures_fts.rowid "
+            "WHERE captures_fts MATCH ? ORDER BY score LIMIT ?"
+        )
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, (query, limit)).fetchall()
+            except sqlite3.OperationalError:
+                rows = self._conn.execute(sql, (_literal_query(query), limit)).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def relocate(self, moves: List[Tuple[str, str]]) -> None:
+        """Point entries at files that moved (old path, new path); unknown paths are ignored."""
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN")
+                swapped = [(new, old) for old, new in moves]
+                self._conn.executemany("UPDATE captures SET txt_path = ? WHERE txt_path = ?", swapped)
+                self._conn.executemany("UPDATE captures SET img_path = ? WHERE img_path = ?", swapped)
+                self._conn.execute("COMMIT")
+        except sqlite3.Error as exc:
+            logger.warning("Search index update after move failed: %s", exc)
+            self._rollback()
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM captures").fetchone()[0])
+
+    def rebuild(
+        self,
+        text_dir: str,
+        images_dir: str,
+        workers: int = 0,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        Drop the index and re-add every `.txt` under `text_dir`, pairing each with the image of
+        the same relative stem under `images_dir`, then every archived capture's text from the
+        retention bundles. Files are read on a thread pool while this thread inserts them in
+        batches. Returns the number of captures indexed.
+        """
+        images = _images_by_stem(images_dir)
+        paths = list(_iter_text_files(text_dir))
+        indexed = 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM captures")
+            self._conn.execute("DELETE FROM captures_fts")
+            self._conn.execute("COMMIT")
+        with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) + 4)) as pool:
+            batch: List[Tuple[str, str, float, str]] = []
+            for path, loaded in zip(paths, pool.map(_read_text, paths)):
+                if loaded is None:
+                    continue
+                text, mtime = loaded
+                stem = os.path.splitext(os.path.relpath(path, text_dir))[0]
+                batch.append((path, images.get(stem, ""), mtime, text))
+                if len(batch) >= _REINDEX_BATCH:
+                    indexed += self._insert_batch(batch)
+                    batch = []
+                    if progress is not None:
+                        progress(indexed)
+            if batch:
+                indexed += self._insert_batch(batch)
+        # Captures compacted by retention stay searchable under "bundle.zip:member" paths
+        batch = []
+        for entry in iter_archived_text(os.path.join(images_dir, ARCHIVE_DIRNAME)):
+            batch.append(entry)
+            if len(batch) >= _REINDEX_BATCH:
+                indexed += self._insert_batch(batch)
+                batch = []
+        if batch:
+            indexed += self._insert_batch(batch)
+        with self._lock:
+            self._conn.execute("INSERT INTO captures_fts(captures_fts) VALUES ('optimize')")
+        if progress is not None:
+            progress(indexed)
+        return indexed
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+
+    def _insert_batch(self, batch: List[Tuple[str, str, float, str]]) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            for txt_path, img_path, mtime, text in batch:
+                self._upsert_locked(txt_path, img_path, mtime, "", "", text)
+            self._conn.execute("COMMIT")
+        return len(batch)
+
+    def _upsert_locked(self, txt_path: str, img_path: str, captured_at: float, mode: str, region: str, text: str) -> None:
+        self._delete_locked(txt_path)
+        cur = self._conn.execute(
+            "INSERT INTO captures(txt_path, img_path, captured_at, mode, region) VALUES (?, ?, ?, ?, ?)",
+            (txt_path, img_path, captured_at, mode, region),
+        )
+        self._conn.execute("INSERT INTO captures_fts(rowid, text) VALUES (?, ?)", (cur.lastrowid, text))
+
+    def _delete_locked(self, txt_path: str) -> None:
+        row = self._conn.execute("SELECT id FROM captures WHERE txt_path = ?", (txt_path,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM captures_fts WHERE rowid = ?", (row[0],))
+            self._conn.execute("DELETE FROM captures WHERE id = ?", (row[0],))
+
+    def _rollback(self) -> None:
+        try:
+            with self._lock:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+        except sqlite3.Error:
+            pass
+
+
+def _literal_query(query: str) -> str:
+    """Quote each word so punctuation and FTS5 operators in user input match literally."""
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{w}"' for w in words) or '""'
+
+
+def _iter_text_files(root: str) -> Iterator[str]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.endswith(".txt"):
+                yield os.path.join(dirpath, name)
+
+
+def _images_by_stem(root: str) -> Dict[str, str]:
+    images: Dict[str, str] = {}
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            if name.lower().endswith(_IMAGE_SUFFIXES):
+                path = os.path.join(dirpath, name)
+                images[os.path.splitext(os.path.relpath(path, root))[0]] = path
+    return images
+
+
+def _read_text(path: str) -> Optional[Tuple[str, float]]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        return text, os.path.getmtime(path)
+    except OSError as exc:
+        logger.warning("Skipping unreadable %s: %s", path, exc)
+        return None
+
+
+def format_hit(hit: SearchHit) -> str:
+    when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(hit.captured_at))
+    snippet = " ".join(hit.snippet.split())
+    return f"{when}  {hit.txt_path}\n    {snippet}"
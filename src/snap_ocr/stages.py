@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+StepFn = Callable[[Any], Optional[Any]]  # returns the item for the next stage, or None to drop it
+
+_STOP = object()
+
+
+class StageMetrics:
+    """Counters for one stage; the capacity figure is what the stage could sustain if never starved."""
+
+    def __init__(self, name: str, workers: int) -> None:
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy_s = 0.0
+        self.max_depth = 0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float, outcome: str, depth: int) -> None:
+        with self._lock:
+            self.busy_s += elapsed
+            self.max_depth = max(self.max_depth, depth)
+            if outcome == "ok":
+                self.processed += 1
+            elif outcome == "dropped":
+                self.dropped += 1
+            else:
+                self.failed += 1
+
+    @property
+    def count(self) -> int:
+        return self.processed + self.dropped + self.failed
+
+    def summary(self) -> str:
+        avg_ms = 1000.0 * self.busy_s / self.count if self.count else 0.0
+        rate = self.workers * self.count / self.busy_s if self.busy_s else 0.0
+        return (
+            f"{self.name}: {self.processed} ok, {self.dropped} dropped, {self.failed} failed, "
+            f"avg {avg_ms:.0f} ms, {rate:.1f} jobs/s capacity (workers={self.workers}), max queue {self.max_depth}"
+        )
+
+
+class StagedPipeline:
+    """
+    Chain of worker stages joined by bounded queues. A full queue blocks the stage feeding it,
+    so a slow stage (usually OCR) throttles the ones before it instead of letting frames pile
+    up in memory, while independent jobs still overlap (encode of job N runs during OCR of N-1).
+    Jobs leave every stage in the order they entered it, however many workers it has: a worker
+    that finishes early waits for its predecessors before handing its job on.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Tuple[str, StepFn, int]],
+        queue_size: int,
+        on_error: Callable[[str, BaseException], None],
+        intake_size: Optional[int] = None,
+    ) -> None:
+        self._stages = list(stages)
+        self._queues: List["queue.Queue[Any]"] = [queue.Queue(maxsize=queue_size) for _ in self._stages]
+        if intake_size is not None:
+            self._queues[0] = queue.Queue(maxsize=intake_size)
+        self.metrics = [StageMetrics(name, workers) for name, _fn, workers in self._stages]
+        self._on_error = on_error
+        self._threads: List[threading.Thread] = []
+        self._live = [workers for _name, _fn, workers in self._stages]
+        self._live_lock = threading.Lock()
+        # Per stage: tickets in intake order, and the ticket whose turn it is to hand on
+        self._intake_locks = [threading.Lock() for _ in self._stages]
+        self._tickets = [0 for _ in self._stages]
+        self._turns = [threading.Condition() for _ in self._stages]
+        self._next_turn = [0 for _ in self._stages]
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self._started = False
+
+    def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        for idx, (name, _fn, workers) in enumerate(self._stages):
+            for n in range(workers):
+                thread = threading.Thread(
+                    target=self._run_stage, args=(idx,), name=f"snap-ocr-{name}-{n}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, item: Any, block: bool = False) -> bool:
+        """Feed the first stage; returns False (item not accepted) when it is full and `block` is False."""
+        with self._in_flight_lock:
+            self._in_flight += 1
+        try:
+            self._queues[0].put(item, block=block)
+        except queue.Full:
+            self._finish()
+            return False
+        return True
+
+    def pending(self) -> int:
+        """Jobs accepted but not yet finished (queued or in a stage)."""
+        return self._in_flight
+
+    def stop(self) -> None:
+        """Let queued jobs drain, then end every worker."""
+        for _ in range(self._stages[0][2]):
+            self._queues[0].put(_STOP)
+
+    def join(self, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+    def summary(self) -> str:
+        return "; ".join(m.summary() for m in self.metrics)
+
+    def _finish(self) -> None:
+        with self._in_flight_lock:
+            self._in_flight -= 1
+
+    def _hand_off(self, idx: int, ticket: int, result: Any, outbox: "Optional[queue.Queue[Any]]") -> None:
+        turn = self._turns[idx]
+        with turn:
+            while self._next_turn[idx] != ticket:
+                turn.wait()
+            try:
+                if result is None or outbox is None:
+                    self._finish()
+                else:
+                    outbox.put(result)  # blocks while the next stage is saturated
+            finally:
+                self._next_turn[idx] += 1
+                turn.notify_all()
+
+    def _run_stage(self, idx: int) -> None:
+        name, fn, _workers = self._stages[idx]
+        metrics = self.metrics[idx]
+        inbox = self._queues[idx]
+        outbox = self._queues[idx + 1] if idx + 1 < len(self._queues) else None
+        while True:
+            with self._intake_locks[idx]:
+                item = inbox.get()
+                if item is _STOP:
+                    break
+                ticket = self._tickets[idx]
+                self._tickets[idx] += 1
+            depth = inbox.qsize()
+            started = time.perf_counter()
+            result = None
+            try:
+                result = fn(item)
+            except BaseException as exc:
+                metrics.record(time.perf_counter() - started, "failed", depth)
+                self._on_error(name, exc)
+            else:
+                metrics.record(time.perf_counter() - started, "ok" if result is not None else "dropped", depth)
+            self._hand_off(idx, ticket, result, outbox)
+        # The last worker of a stage to exit stops the next stage
+        with self._live_lock:
+            self._live[idx] -= 1
+            last = self._live[idx] == 0
+        if last and outbox is not None:
+            for _ in range(self._stages[idx + 1][2]):
+                outbox.put(_STOP)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import logging
+import math
+from typing import List, Optional, Tuple
+
+from PIL import Image, ImageFilter
+
+
+logger = logging.getLogger(__name__)
+
+Box = Tuple[int, int, int, int]  # left, top, right, bottom (exclusive)
+
+_MAX_SIDE = 960  # detection runs on a frame downsampled to at most this size
+_CELL = 8  # grid cell size on the downsampled frame
+_EDGE_THRESHOLD = 40
+_CELL_DENSITY = 24  # mean of a binary edge cell (0-255) that marks it as text-like
+_MIN_CELLS = 2
+_PAD_CELLS = 1
+_MAX_REGIONS = 12
+_MAX_COVERAGE = 0.7  # above this share of the frame, cropping saves too little to bother
+
+
+def _components(grid: List[List[bool]]) -> List[Box]:
+    """Bounding boxes (in cells) of 8-connected groups of marked cells."""
+    rows = len(grid)
+    cols = len(grid[0]) if rows else 0
+    seen = [[False] * cols for _ in range(rows)]
+    boxes: List[Box] = []
+    for y in range(rows):
+        for x in range(cols):
+            if not grid[y][x] or seen[y][x]:
+                continue
+            stack = [(y, x)]
+            seen[y][x] = True
+            left, top, right, bottom, count = x, y, x, y, 0
+            while stack:
+                cy, cx = stack.pop()
+                count += 1
+                left, right = min(left, cx), max(right, cx)
+                top, bottom = min(top, cy), max(bottom, cy)
+                for ny in (cy - 1, cy, cy + 1):
+                    if ny < 0 or ny >= rows:
+                        continue
+                    for nx in (cx - 1, cx, cx + 1):
+                        if 0 <= nx < cols and grid[ny][nx] and not seen[ny][nx]:
+                            seen[ny][nx] = True
+                            stack.append((ny, nx))
+            if count >= _MIN_CELLS:
+                boxes.append((left, top, right + 1, bottom + 1))
+    return boxes
+
+
+def _merge_overlapping(boxes: List[Box]) -> List[Box]:
+    merged = list(boxes)
+    changed = True
+    while changed:
+        changed = False
+        out: List[Box] = []
+        for box in merged:
+            for i, other in enumerate(out):
+                if box[0] <= other[2] and other[0] <= box[2] and box[1] <= other[3] and other[1] <= box[3]:
+                    out[i] = (min(box[0], other[0]), min(box[1], other[1]), max(box[2], other[2]), max(box[3], other[3]))
+                    changed = True
+                    break
+            else:
+                out.append(box)
+        merged = out
+    return merged
+
+
+def find_text_regions(img: Image.Image) -> Optional[List[Box]]:
+    """
+    Locate likely text areas from edge density on a downsampled frame.
+    Returns boxes in full-resolution pixels, or None when the whole frame should be
+    OCRed instead (nothing found, too many regions, or regions cover most of the frame).
+    """
+    width, height = img.size
+    if width < _CELL * 4 or height < _CELL * 4:
+        return None
+    factor = max(1, math.ceil(max(width, height) / _MAX_SIDE))
+    small = img.convert("L").reduce(factor)
+    edges = small.filter(ImageFilter.FIND_EDGES).point(lambda v: 255 if v > _EDGE_THRESHOLD else 0)
+    cols = max(1, small.width // _CELL)
+    rows = max(1, small.height // _CELL)
+    density = list(edges.resize((cols, rows), Image.BOX).getdata())
+    grid = [[density[r * cols + c] >= _CELL_DENSITY for c in range(cols)] for r in range(rows)]
+    # Frame border always has edge response from the filter; ignore it
+    for c in range(cols):
+        grid[0][c] = grid[-1][c] = False
+    for r in range(rows):
+        grid[r][0] = grid[r][-1] = False
+
+    boxes = [
+        (max(0, l - _PAD_CELLS), max(0, t - _PAD_CELLS), min(cols, r + _PAD_CELLS), min(rows, b + _PAD_CELLS))
+        for l, t, r, b in _components(grid)
+    ]
+    boxes = _merge_overlapping(boxes)
+    if not boxes:
+        logger.debug("Text detection found no candidate regions; using whole frame")
+        return None
+    if len(boxes) > _MAX_REGIONS:
+        boxes = [(min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes))]
+
+    scale_x = width / cols
+    scale_y = height / rows
+    regions = [
+        (
+            int(l * scale_x),
+            int(t * scale_y),
+            min(width, int(math.ceil(r * scale_x))),
+            min(height, int(math.ceil(b * scale_y))),
+        )
+        for l, t, r, b in boxes
+    ]
+    area = sum((r - l) * (b - t) for l, t, r, b in regions)
+    coverage = area / float(width * height)
+    if coverage > _MAX_COVERAGE:
+        logger.debug("Text regions cover %.0f%% of the frame; using whole frame", coverage * 100)
+        return None
+    logger.debug("Text detection: %d regions covering %.0f%% of the frame", len(regions), coverage * 100)
+    regions.sort(key=lambda box: (box[1], box[0]))
+    return regions
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from .ocr import DEFAULT_PSM, OcrBackend, OcrLine, _normalize_choices, perform_ocr_lines
+from .preprocess import Pipeline
+
+if TYPE_CHECKING:
+    from .ocr_pool import OcrProcessPool
+
+
+Tile = Tuple[Image.Image, Tuple[int, int]]
+
+
+def region_tiles(img: Image.Image, boxes: Sequence[Tuple[int, int, int, int]]) -> List[Tile]:
+    """Crop (left, top, right, bottom) boxes out of a frame as tiles."""
+    return [(img.crop(box), (box[0], box[1])) for box in boxes]
+
+
+def regions_bbox(regions: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+    """Smallest desktop rect covering every region, so one grab serves them all."""
+    left = min(r["left"] for r in regions)
+    top = min(r["top"] for r in regions)
+    right = max(r["left"] + r["width"] for r in regions)
+    bottom = max(r["top"] + r["height"] for r in regions)
+    return {"left": left, "top": top, "width": right - left, "height": bottom - top}
+
+
+def named_region_tiles(
+    img: Image.Image, bbox: Dict[str, int], regions: Sequence[Dict[str, Any]]
+) -> List[Tuple[str, Tile]]:
+    """
+    Crop each named region out of a grab of `bbox`. Only the region's own pixels are copied,
+    never the whole grab; offsets are relative to the grab.
+    """
+    # Retina/HiDPI grabs are in physical pixels while region rects are in points
+    sx = img.width / bbox["width"]
+    sy = img.height / bbox["height"]
+    tiles: List[Tuple[str, Tile]] = []
+    for r in regions:
+        left = int(round((r["left"] - bbox["left"]) * sx))
+        top = int(round((r["top"] - bbox["top"]) * sy))
+        right = min(img.width, left + int(round(r["width"] * sx)))
+        bottom = min(img.height, top + int(round(r["height"] * sy)))
+        tiles.append((r["name"], (img.crop((left, top, right, bottom)), (left, top))))
+    return tiles
+
+
+def monitor_tiles(img: Image.Image, virtual: Dict[str, int], monitors: Sequence[Dict[str, int]]) -> List[Tile]:
+    """
+    Crop a full virtual-screen capture into one tile per physical monitor.
+    Monitor rects are in desktop coordinates; `virtual` is the rect the image was grabbed from.
+    """
+    # Retina/HiDPI grabs are in physical pixels while monitor rects are in points
+    sx = img.width / virtual["width"] if virtual.get("width") else 1.0
+    sy = img.height / virtual["height"] if virtual.get("height") else 1.0
+    tiles: List[Tile] = []
+    for mon in monitors:
+        left = max(0, int(round((int(mon["left"]) - int(virtual["left"])) * sx)))
+        top = max(0, int(round((int(mon["top"]) - int(virtual["top"])) * sy)))
+        right = min(img.width, left + int(round(int(mon["width"]) * sx)))
+        bottom = min(img.height, top + int(round(int(mon["height"]) * sy)))
+        if right <= left or bottom <= top:
+            continue
+        tiles.append((img.crop((left, top, right, bottom)), (left, top)))
+    # Reading order: top-to-bottom, then left-to-right
+    tiles.sort(key=lambda t: (t[1][1], t[1][0]))
+    return tiles
+
+
+def merge_lines(lines: Sequence[OcrLine]) -> str:
+    """
+    Stitch lines from several tiles into one text in reading order, the way a single
+    `--psm 6` pass over the whole frame lays them out: lines that share a baseline band
+    across tiles become one output line, and paragraph breaks become blank lines.
+    """
+    rows: List[List[OcrLine]] = []
+    spans: List[Tuple[int, int]] = []
+    for line in sorted(lines, key=lambda ln: ((ln.top + ln.bottom) / 2, ln.left)):
+        if rows:
+            top, bottom = spans[-1]
+            overlap = min(bottom, line.bottom) - max(top, line.top)
+            if overlap > 0.5 * max(1, min(line.height, bottom - top)):
+                rows[-1].append(line)
+                spans[-1] = (min(top, line.top), max(bottom, line.bottom))
+                continue
+        rows.append([line])
+        spans.append((line.top, line.bottom))
+
+    out: List[str] = []
+    prev_pars: set = set()
+    for row in rows:
+        row.sort(key=lambda ln: ln.left)
+        pars = {ln.paragraph for ln in row}
+        if out and not (pars & prev_pars):
+            out.append("")
+        out.append(" ".join(ln.text for ln in row))
+        prev_pars = pars
+    return "\n".join(out) + "\n" if out else ""
+
+
+def ocr_tiles(
+    pool: "OcrProcessPool",
+    tiles: Sequence[Tile],
+    lang: str,
+    pipeline: Optional[Pipeline] = None,
+    psm: int = DEFAULT_PSM,
+    oem: Optional[int] = None,
+) -> str:
+    results = pool.ocr_lines(tiles, lang, pipeline, psm, oem)
+    merged = merge_lines([line for lines in results for line in lines])
+    return _normalize_choices(merged)
+
+
+def ocr_tiles_each(
+    pool: "OcrProcessPool",
+    tiles: Sequence[Tile],
+    lang: str,
+    pipeline: Optional[Pipeline] = None,
+    psm: int = DEFAULT_PSM,
+    oem: Optional[int] = None,
+) -> List[str]:
+    """OCR tiles concurrently on the pool, returning one text per tile instead of a merged page."""
+    results = pool.ocr_lines(tiles, lang, pipeline, psm, oem)
+    return [_normalize_choices(merge_lines(lines)) for lines in results]
+
+
+def ocr_tiles_inline(
+    backend: OcrBackend,
+    tiles: Sequence[Tile],
+    lang: str,
+    tesseract_cmd: Optional[str] = None,
+    pipeline: Optional[Pipeline] = None,
+    psm: int = DEFAULT_PSM,
+    oem: Optional[int] = None,
+) -> str:
+    """Sequential variant of ocr_tiles on the in-process engine (no pool start-up cost)."""
+    lines: List[OcrLine] = []
+    for idx, (img, offset) in enumerate(tiles):
+        lines.extend(
+            perform_ocr_lines(
+                img, lang, tesseract_cmd, backend=backend, offset=offset, tag=idx, pipeline=pipeline, psm=psm, oem=oem
+            )
+        )
+    return _normalize_choices(merge_lines(lines))
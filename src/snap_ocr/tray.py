@@ -4,7 +4,7 @@ import os
 import sys
 import threading
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Dict, List, Optional
 
 from PIL import Image, ImageDraw, ImageFont, ImageOps
 import pystray
@@ -108,10 +108,21 @@ class TrayManager:
         self._icon = pystray.Icon("Snap OCR", icon=base_icon.copy(), title="Snap OCR")
         self._icon_lock = threading.Lock()
         self._flash_timer: Optional[threading.Timer] = None
+        self._icon.menu = self._build_menu()
 
+    def refresh_menu(self, layout: Optional[List[Dict[str, int]]] = None) -> None:
+        """Rebuild the menu for new OCR profiles (Reload Config) or a changed display layout."""
+        try:
+            self._icon.menu = self._build_menu(layout)
+            self._icon.update_menu()
+        except Exception:
+            pass
+
+    def _build_menu(self, layout: Optional[List[Dict[str, int]]] = None) -> pystray.Menu:
         capture_items = [
             pystray.MenuItem("Full", self._wrap(lambda: self.app.set_capture_mode("full")), checked=lambda _: getattr(self.app, "capture_mode", "full") == "full"),
             pystray.MenuItem("Region", self._wrap(lambda: self.app.set_capture_mode("region")), checked=lambda _: getattr(self.app, "capture_mode", "full") == "region"),
+            pystray.MenuItem("Monitor", pystray.Menu(*self._monitor_items(layout))),
         ]
         if sys.platform == "win32":
             capture_items.append(
@@ -122,13 +133,28 @@ class TrayManager:
                 pystray.MenuItem("MacsyZones", self._wrap(lambda: self.app.set_capture_mode("macsyzones")), checked=lambda _: getattr(self.app, "capture_mode", "full") == "macsyzones")
             )
 
-        self._icon.menu = pystray.Menu(
+        profile_items = [
+            pystray.MenuItem(
+                name.capitalize(),
+                self._wrap(lambda name=name: self.app.set_ocr_profile(name)),
+                checked=lambda _, name=name: getattr(self.app, "ocr_profile", "balanced") == name,
+            )
+            for name in ["auto", *self.app.ocr_profiles]
+        ]
+
+        return pystray.Menu(
             pystray.MenuItem("Take Screenshot Now", self._wrap(self.app.take_screenshot_now)),
             pystray.MenuItem(
                 "Capture Mode",
                 pystray.Menu(*capture_items),
             ),
+            pystray.MenuItem("OCR Profile", pystray.Menu(*profile_items)),
             pystray.MenuItem("Pick Region…", self._wrap(self.app.pick_region, run_async=False)),
+            pystray.MenuItem(
+                "Watch Mode",
+                self._wrap(self.app.toggle_watch_mode),
+                checked=lambda item: self.app.watcher.active,
+            ),
             pystray.MenuItem(
                 "Overwrite Mode",
                 self._wrap(self.app.toggle_overwrite_mode),
@@ -145,14 +171,46 @@ class TrayManager:
             pystray.MenuItem("Quit", self._wrap(self.app.quit, run_async=False)),
         )
 
+    def _monitor_items(self, layout: Optional[List[Dict[str, int]]] = None) -> list[pystray.MenuItem]:
+        items = [
+            pystray.MenuItem(
+                "Under Cursor",
+                self._wrap(lambda: self.app.set_capture_mode("monitor_under_cursor")),
+                checked=lambda _: getattr(self.app, "capture_mode", "full") == "monitor_under_cursor",
+            )
+        ]
+        try:
+            if layout is None:
+                layout = self.app.capture.monitors()
+            monitors = layout[1:] or layout[:1]
+        except Exception:
+            monitors = []
+        for idx, mon in enumerate(monitors):
+            mode = f"monitor:{idx}"
+            items.append(
+                pystray.MenuItem(
+                    f"Display {idx + 1} ({mon['width']}×{mon['height']})",
+                    self._wrap(lambda mode=mode: self.app.set_capture_mode(mode)),
+                    checked=lambda _, mode=mode: getattr(self.app, "capture_mode", "full") == mode,
+                )
+            )
+        return items
+
     def _wrap(self, func: Callable[[], None], run_async: bool = True) -> Callable:
         def _inner(icon: pystray.Icon, item: Optional[pystray.MenuItem] = None) -> None:  # type: ignore[type-arg]
             if run_async:
-                threading.Thread(target=func, daemon=True).start()
+                threading.Thread(target=self._run_released, args=(func,), daemon=True).start()
             else:
                 func()
         return _inner
 
+    def _run_released(self, func: Callable[[], None]) -> None:
+        # Tray actions grab on a throwaway thread; close its capture handle when it is done
+        try:
+            func()
+        finally:
+            self.app.capture.release_thread()
+
     def _restore_base_icon(self) -> None:
         with self._icon_lock:
             timer = self._flash_timer
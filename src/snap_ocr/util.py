@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import os
+import shutil
 import time
+from typing import Optional
 
 
-def build_timestamped_name() -> str:
+def build_timestamped_name(when: Optional[time.struct_time] = None) -> str:
     # YYYYMMDD_HHMMSS
-    return time.strftime("%Y%m%d_%H%M%S", time.localtime())
+    return time.strftime("%Y%m%d_%H%M%S", when or time.localtime())
 
 
 def atomic_write_bytes(path: str, data: bytes) -> None:
@@ -26,3 +28,30 @@ def atomic_write_text(path: str, text: str, encoding: str = "utf-8") -> None:
         os.fsync(f.fileno())
     os.replace(tmp_path, path)
 
+
+
+def atomic_link(src: str, dst: str) -> bool:
+    """
+    Make `dst` a hardlink to `src`, replacing any existing file. Falls back to a copy where
+    hardlinks are unavailable (other volume, FAT, some network shares); returns True if linked.
+    """
+    tmp_path = dst + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(src, tmp_path)
+        linked = True
+    except OSError:
+        shutil.copyfile(src, tmp_path)
+        linked = False
+    os.replace(tmp_path, dst)
+    return linked
+
+
+def remove_sqlite_files(path: str) -> None:
+    """Delete a SQLite database with its WAL and shared-memory files, so a new one starts clean."""
+    for name in (path, f"{path}-wal", f"{path}-shm"):
+        try:
+            os.remove(name)
+        except FileNotFoundError:
+            pass
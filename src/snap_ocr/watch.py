@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+from PIL import Image, ImageChops
+
+from .errors import ErrorCode, SnapOcrError
+
+if TYPE_CHECKING:
+    from .app import App
+
+
+logger = logging.getLogger(__name__)
+
+_THUMB_SIDE = 256  # change detection compares frames downsampled to at most this size
+_PIXEL_DELTA = 16  # gray-level difference that counts a thumbnail pixel as changed
+_ERROR_BACKOFF_S = 5.0
+
+
+def thumbnail(img: Image.Image) -> Image.Image:
+    """Small grayscale copy; box averaging smooths cursor blink and anti-aliasing noise."""
+    factor = max(1, max(img.width, img.height) // _THUMB_SIDE)
+    return img.convert("L").reduce(factor)
+
+
+def changed_fraction(a: Image.Image, b: Image.Image) -> float:
+    if a.size != b.size:
+        return 1.0
+    hist = ImageChops.difference(a, b).histogram()
+    return sum(hist[_PIXEL_DELTA:]) / float(a.width * a.height)
+
+
+class Watcher:
+    """
+    Samples the capture target on a timer and queues a normal capture job (with the frame
+    it grabbed) only when the content changed. Sampling cost is capped by `watch_cpu_budget`:
+    when grabs get expensive the interval stretches instead of eating a core.
+    """
+
+    def __init__(self, app: "App") -> None:
+        self.app = app
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last: Optional[Image.Image] = None
+        self._last_key = None
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.active:
+            return
+        self._stop.clear()
+        self._last = None
+        self._thread = threading.Thread(target=self._loop, name="snap-ocr-watch", daemon=True)
+        self._thread.start()
+        logger.info("Watch mode started (every %d ms)", self.app.config.watch_interval_ms)
+
+    def stop(self) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join(timeout=2)
+        self._thread = None
+        logger.info("Watch mode stopped")
+
+    def toggle(self) -> None:
+        if self.active:
+            self.stop()
+        else:
+            self.start()
+
+    def _loop(self) -> None:
+        try:
+            self._watch()
+        finally:
+            # Each start() runs on a new thread; don't keep its capture handle until shutdown
+            self.app.capture.release_thread()
+
+    def _watch(self) -> None:
+        while not self._stop.is_set():
+            cfg = self.app.config
+            started = time.thread_time()
+            delay = cfg.watch_interval_ms / 1000.0
+            try:
+                self._sample()
+            except SnapOcrError as exc:
+                self.app._record_error(exc)
+                delay = max(delay, _ERROR_BACKOFF_S)
+            except Exception as exc:
+                self.app._record_error(SnapOcrError(ErrorCode.CAPTURE_FAILED, f"Watch capture failed: {exc}", exc))
+                delay = max(delay, _ERROR_BACKOFF_S)
+            cost = time.thread_time() - started
+            # Keep cost / (cost + sleep) at or below the budget
+            budget_sleep = cost * (1.0 - cfg.watch_cpu_budget) / cfg.watch_cpu_budget
+            if budget_sleep > delay:
+                logger.debug("Watch sample cost %.0f ms; stretching interval to %.0f ms", cost * 1000, budget_sleep * 1000)
+            self._stop.wait(max(delay, budget_sleep))
+
+    def _sample(self) -> None:
+        app = self.app
+        mode = app.capture_mode
+        img = app._capture(mode)
+        thumb = thumbnail(img)
+        key = (mode, img.size)
+        if self._last is not None and key == self._last_key:
+            fraction = changed_fraction(self._last, thumb)
+            if fraction < app.config.watch_threshold:
+                return
+            logger.debug("Watch: %.1f%% of the frame changed", fraction * 100)
+        if app.pipeline.pending():
+            # OCR is behind; keep the old reference so the change is picked up on a later tick
+            return
+        self._last = thumb
+        self._last_key = key
+        app._enqueue_frame("watch", mode, img)
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from .util import atomic_link
+
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = ("strict", "batched", "none")
+
+MAX_QUEUED_BYTES = 256 * 1024 * 1024  # write() blocks while this much file data awaits the disk
+STRICT_FLUSH_TIMEOUT_S = 30.0
+
+ErrorFn = Callable[[str, BaseException], None]
+
+
+@dataclass
+class _Op:
+    kind: str  # "write" | "link" | "remove" | "flush"
+    path: str = ""
+    data: Union[bytes, memoryview, None] = None
+    src: str = ""
+    done: Optional[threading.Event] = None
+    tmp_path: str = ""
+    size: int = 0
+    failed: bool = False
+
+
+@dataclass
+class WriterStats:
+    batches: int = 0
+    files: int = 0
+    fsyncs: int = 0
+    busy_s: float = 0.0
+    failed: int = 0
+    largest_batch: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def summary(self) -> str:
+        per_batch = self.files / self.batches if self.batches else 0.0
+        avg_ms = 1000.0 * self.busy_s / self.batches if self.batches else 0.0
+        return (
+            f"{self.files} files in {self.batches} commits ({per_batch:.1f}/commit, largest {self.largest_batch}), "
+            f"{self.fsyncs} fsyncs, avg {avg_ms:.0f} ms/commit, {self.failed} failed"
+        )
+
+
+class ArtifactWriter:
+    """
+    Background writer with group commit. Captures queue their files and return at once; the
+    writer thread takes everything queued since its last commit, writes each file to a temp
+    name, fsyncs the batch, renames the files into place and fsyncs each parent directory
+    once. Links and removals are applied in submission order, so overwrite mode and duplicate
+    links see the files queued before them.
+
+    Durability: `strict` and `batched` commit the same way, but with `strict` callers wait on
+    flush() after each capture; `none` skips fsync entirely.
+
+    Queued file data is capped at `max_queued_bytes`: once the disk falls that far behind,
+    write() blocks until a commit frees room, instead of holding ever more images in memory.
+    """
+
+    def __init__(
+        self,
+        durability: str = "batched",
+        on_error: Optional[ErrorFn] = None,
+        max_queued_bytes: int = MAX_QUEUED_BYTES,
+    ) -> None:
+        self.durability = durability.lower()
+        self.on_error = on_error
+        self.max_queued_bytes = max_queued_bytes
+        self.stats = WriterStats()
+        self._queue: "queue.Queue[Optional[_Op]]" = queue.Queue()
+        self._queued_bytes = 0
+        self._room = threading.Condition(threading.Lock())
+        # path -> (queued ops touching it, whether it exists once they are applied)
+        self._pending: Dict[str, Tuple[int, bool]] = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="snap-ocr-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def waits_for_disk(self) -> bool:
+        return self.durability == "strict"
+
+    def write(self, path: str, data: Union[bytes, memoryview, str]) -> None:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        size = memoryview(data).nbytes
+        with self._room:
+            # A single file larger than the cap still goes through once the queue is empty
+            while self._queued_bytes and self._queued_bytes + size > self.max_queued_bytes:
+                if not self._thread.is_alive():
+                    break
+                self._room.wait(1.0)
+            self._queued_bytes += size
+        self._submit(_Op("write", path, data=data, size=size), exists=True)
+
+    def link(self, src: str, dst: str) -> None:
+        """Hardlink (or copy) `src` to `dst` once everything queued before it is in place."""
+        self._submit(_Op("link", dst, src=src), exists=True)
+
+    def remove(self, path: str) -> None:
+        self._submit(_Op("remove", path), exists=False)
+
+    def exists(self, path: str) -> bool:
+        """Whether `path` is on disk once the queued operations are applied."""
+        with self._lock:
+            pending = self._pending.get(path)
+        if pending is not None:
+            return pending[1]
+        return os.path.isfile(path)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is committed; False on timeout."""
+        done = threading.Event()
+        self._queue.put(_Op("flush", done=done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        if not self._thread.is_alive():
+            return
+        self.flush(timeout)
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _submit(self, op: _Op, exists: bool) -> None:
+        with self._lock:
+            count, _ = self._pending.get(op.path, (0, exists))
+            self._pending[op.path] = (count + 1, exists)
+        self._queue.put(op)
+
+    def _release(self, size: int) -> None:
+        with self._room:
+            self._queued_bytes -= size
+            self._room.notify_all()
+
+    def _settle(self, path: str) -> None:
+        with self._lock:
+            count, exists = self._pending.get(path, (1, False))
+            if count <= 1:
+                self._pending.pop(path, None)
+            else:
+                self._pending[path] = (count - 1, exists)
+
+    def _run(self) -> None:
+        while True:
+            op = self._queue.get()
+            if op is None:
+                return
+            # Group commit: everything that queued up during the previous commit goes in this one
+            batch = [op]
+            stop = False
+            while True:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            try:
+                self._commit(batch)
+            except Exception as exc:  # pragma: no cover - defensive; per-file errors are handled below
+                logger.exception("Writer commit failed: %s", exc)
+            for item in batch:
+                if item.kind == "flush" and item.done is not None:
+                    item.done.set()
+            if stop:
+                return
+
+    def _commit(self, batch: List[_Op]) -> None:
+        started = time.perf_counter()
+        sync = self.durability != "none"
+        writes = [op for op in batch if op.kind == "write"]
+        fsyncs = 0
+
+        # 1. Temp files, each flushed to disk before any of them is published
+        for n, op in enumerate(writes):
+            op.tmp_path = f"{op.path}.{n}.tmp"  # one path may be written twice in a batch (overwrite mode)
+            try:
+                with open(op.tmp_path, "wb") as f:
+                    f.write(op.data)  # type: ignore[arg-type]
+                    if sync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                        fsyncs += 1
+            except Exception as exc:
+                op.failed = True
+                self._fail(op.path, exc)
+                try:
+                    os.remove(op.tmp_path)
+                except OSError:
+                    pass
+            op.data = None
+            self._release(op.size)
+
+        # 2. Publish in submission order
+        dirs: Set[str] = set()
+        files = 0
+        for op in batch:
+            if op.kind == "flush":
+                continue
+            try:
+                if op.kind == "write" and not op.failed:
+                    os.replace(op.tmp_path, op.path)
+                    files += 1
+                elif op.kind == "link":
+                    atomic_link(op.src, op.path)
+                    files += 1
+                elif op.kind == "remove":
+                    if os.path.exists(op.path):
+                        os.remove(op.path)
+                        logger.debug("Removed previous output: %s", op.path)
+                dirs.add(os.path.dirname(os.path.abspath(op.path)))
+            except Exception as exc:
+                if op.kind == "remove":
+                    logger.warning("Failed to remove previous output %s: %s", op.path, exc)
+                else:
+                    self._fail(op.path, exc)
+            finally:
+                self._settle(op.path)
+
+        # 3. One fsync per directory makes the renames durable
+        if sync:
+            for directory in dirs:
+                if _fsync_dir(directory):
+                    fsyncs += 1
+
+        elapsed = time.perf_counter() - started
+        stats = self.stats
+        with stats._lock:
+            stats.batches += 1
+            stats.files += files
+            stats.fsyncs += fsyncs
+            stats.busy_s += elapsed
+            stats.largest_batch = max(stats.largest_batch, files)
+        if files:
+            logger.debug("Committed %d files with %d fsyncs in %.0f ms", files, fsyncs, elapsed * 1000.0)
+
+    def _fail(self, path: str, exc: BaseException) -> None:
+        with self.stats._lock:
+            self.stats.failed += 1
+        if self.on_error is not None:
+            self.on_error(path, exc)
+        else:
+            logger.error("Failed to save %s: %s", path, exc)
+
+
+def _fsync_dir(path: str) -> bool:
+    # Directories can't be opened for fsync on Windows; NTFS renames are journaled anyway
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        os.fsync(fd)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)